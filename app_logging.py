@@ -0,0 +1,103 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import tempfile
+
+LOGGER_NAME = "AppLogger"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+LOG_FILE_NAME = "app.log"
+
+# Environment overrides of the defaults, e.g. HCCB_LOG_LEVEL=DEBUG
+LEVEL_ENV = "HCCB_LOG_LEVEL"
+FILE_ENV = "HCCB_LOG_FILE"
+
+_listener = None
+_queue_handler = None
+_log_file = None
+
+
+def default_log_file():
+    """$HCCB_LOG_FILE, else app.log next to the executable (frozen) or the scripts."""
+    if os.environ.get(FILE_ENV):
+        return os.path.abspath(os.environ[FILE_ENV])
+    if getattr(sys, "frozen", False):
+        base_path = os.path.dirname(sys.executable)
+    else:
+        base_path = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, LOG_FILE_NAME)
+
+
+def parse_level(level=None):
+    """Logging level from a name or number; None reads $HCCB_LOG_LEVEL (default INFO)."""
+    if level is None:
+        level = os.environ.get(LEVEL_ENV) or "INFO"
+    if isinstance(level, int):
+        return level
+    value = logging.getLevelName(str(level).upper())
+    if not isinstance(value, int):
+        raise ValueError(f"Unknown log level: {level}")
+    return value
+
+
+def _writable(path):
+    try:
+        with open(path, "a", encoding="utf-8"):
+            return True
+    except OSError:
+        return False
+
+
+def configure_logging(level=None, log_file=None, console=False):
+    """
+    Send the AppLogger records through a queue to one log file.
+
+    Callers only put records on an in-memory queue; a listener thread
+    formats and writes them, so logging never waits on the disk. The log
+    location is fixed by the first call (``log_file``, else
+    default_log_file(), else the temp folder when that is not writable);
+    later calls only change the level. ``console=True`` also echoes the
+    records to stderr. Called once by each entry point; modules just use
+    logging.getLogger("AppLogger").
+
+    Returns the log file path.
+    """
+    global _listener, _queue_handler, _log_file
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(parse_level(level))
+    if _listener is not None:
+        return _log_file
+
+    _log_file = os.path.abspath(log_file) if log_file else default_log_file()
+    if not _writable(_log_file):
+        _log_file = os.path.join(tempfile.gettempdir(), LOG_FILE_NAME)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.FileHandler(_log_file, encoding="utf-8")]
+    if console:
+        handlers.append(logging.StreamHandler(sys.stderr))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    records = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(records)
+    logger.addHandler(_queue_handler)
+    _listener = logging.handlers.QueueListener(records, *handlers)
+    _listener.start()
+    # Flush the queue when the program ends
+    atexit.register(shutdown_logging)
+    return _log_file
+
+
+def shutdown_logging():
+    """Write out the queued records and stop the listener thread."""
+    global _listener, _queue_handler
+    if _listener is not None:
+        logging.getLogger(LOGGER_NAME).removeHandler(_queue_handler)
+        _queue_handler = None
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,75 @@
+"""
+Check that the GUI module imports within a time budget and without the
+report engine, so the window can be drawn before pandas and openpyxl load:
+
+    python benchmarks/import_budget.py --budget-ms 300
+
+Every measurement runs in a fresh Python process; the median of --runs is
+compared to the budget. Exits with 1 when the budget is exceeded or a heavy
+module is imported eagerly, so it can gate a build.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULE = "main_gui"
+DEFAULT_BUDGET_MS = 300
+# Must not be imported by DEFAULT_MODULE itself
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "modified_excel", "summary_report_tool")
+
+_PROBE = """
+import json, sys, time
+sys.path.insert(0, {repo!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "loaded": [name for name in {heavy!r} if name in sys.modules and name != {module!r}],
+}}))
+"""
+
+
+def measure(module=DEFAULT_MODULE):
+    """Import ``module`` in a fresh interpreter; returns (milliseconds, heavy modules loaded)."""
+    code = _PROBE.format(repo=REPO_DIR, module=module, heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result["import_ms"], result["loaded"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the GUI import time budget.")
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    timings, loaded = [], set()
+    for _ in range(args.runs):
+        milliseconds, heavy = measure(args.module)
+        timings.append(milliseconds)
+        loaded.update(heavy)
+    median = statistics.median(timings)
+
+    print(f"import {args.module}: median {median:.0f} ms over {args.runs} runs "
+          f"(min {min(timings):.0f}, max {max(timings):.0f}), budget {args.budget_ms:.0f} ms")
+    failed = False
+    if loaded:
+        print(f"FAIL: imported eagerly: {', '.join(sorted(loaded))}")
+        failed = True
+    if median > args.budget_ms:
+        print("FAIL: import time budget exceeded")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,174 @@
+"""
+Time both pipeline stages on synthetic data and write the results as JSON:
+
+    python benchmarks/run_benchmarks.py --sizes 10 100 1000 5000 --output results.json
+    python benchmarks/run_benchmarks.py --sizes 10 100 --baseline results.json
+
+Every stage runs in a fresh Python process, so each measurement starts
+cold and its peak RSS is its own. Runs fully offline.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_data import generate_dataset  # noqa: E402
+
+DEFAULT_SIZES = [10, 100, 1000, 5000]
+STAGES = ("report", "summary")
+
+
+def _peak_rss_mb():
+    """Peak RSS of this process and of its (pool) children, in MB; None where unsupported."""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None, None
+        return psutil.Process().memory_info().peak_wset / 2**20, None
+    # ru_maxrss is in kB on Linux and in bytes on macOS
+    scale = 2**20 if sys.platform == "darwin" else 2**10
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children or None
+
+
+def run_stage(stage, data_dir, workers):
+    """Run one stage in this process; returns its measurement."""
+    sys.path.insert(0, REPO_DIR)
+    os.chdir(data_dir)
+    report_file = os.path.join(data_dir, "report.xlsx")
+
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        if stage == "report":
+            import modified_excel
+
+            start = time.perf_counter()
+            result = modified_excel.select_excel_files(
+                dump_folder=os.path.join(data_dir, "dump"),
+                plan_file=os.path.join(data_dir, "plan.xlsx"),
+                workers=workers,
+                output_file=report_file,
+                create_new=True,
+                # Generated data repeats across runs; always measure real parsing
+                use_cache=False,
+            )
+        else:
+            import summary_report_tool
+
+            summary_file = os.path.join(data_dir, "summary.xlsx")
+            shutil.copy(report_file, summary_file)
+            start = time.perf_counter()
+            result = summary_report_tool.extract_distributor_data(summary_file)
+        wall = time.perf_counter() - start
+
+    own_rss, children_rss = _peak_rss_mb()
+    return {
+        "ok": bool(result),
+        "wall_s": round(wall, 3),
+        "peak_rss_mb": round(own_rss, 1) if own_rss else None,
+        "peak_worker_rss_mb": round(children_rss, 1) if children_rss else None,
+    }
+
+
+def measure(stage, data_dir, workers):
+    """Run one stage in a fresh interpreter and return its measurement."""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--stage", stage, "--data", data_dir,
+         "--workers", str(workers)],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        return {"ok": False, "error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline):
+    """Print wall time and peak RSS of each run relative to a baseline result file."""
+    previous = {(r["stage"], r["distributors"]): r for r in baseline.get("runs", [])}
+    print("\nstage     distributors   wall (x baseline)   peak RSS (x baseline)")
+    for run in results["runs"]:
+        before = previous.get((run["stage"], run["distributors"]))
+        if not before or not run.get("ok") or not before.get("ok"):
+            continue
+        wall = run["wall_s"] / before["wall_s"] if before["wall_s"] else float("nan")
+        rss = (run["peak_rss_mb"] / before["peak_rss_mb"]
+               if run.get("peak_rss_mb") and before.get("peak_rss_mb") else float("nan"))
+        print(f"{run['stage']:<9} {run['distributors']:>12}   {wall:>17.2f}   {rss:>21.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark report and summary generation.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="distributor counts")
+    parser.add_argument("--items", type=int, default=10, help="item rows per distributor")
+    parser.add_argument("--per-file", type=int, default=50, help="distributors per dump file")
+    parser.add_argument("--workers", type=int, default=1, help="dump parsing processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON result file")
+    parser.add_argument("--baseline", help="earlier JSON result file to compare against")
+    parser.add_argument("--keep-data", metavar="FOLDER", help="keep the generated data in this folder")
+    # Internal: run a single stage and print its measurement
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--data", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.stage:
+        print(json.dumps(run_stage(args.stage, args.data, args.workers)))
+        return
+
+    results = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "parameters": {
+            "items_per_distributor": args.items,
+            "distributors_per_file": args.per_file,
+            "workers": args.workers,
+            "seed": args.seed,
+        },
+        "runs": [],
+    }
+
+    root = args.keep_data or tempfile.mkdtemp(prefix="hccb_bench_")
+    try:
+        for size in args.sizes:
+            data_dir = os.path.abspath(os.path.join(root, f"n{size}"))
+            files = max(1, -(-size // args.per_file))
+            generate_dataset(data_dir, distributors=size, items=args.items, files=files, seed=args.seed)
+            for stage in STAGES:
+                run = {"stage": stage, "distributors": size, "files": files}
+                run.update(measure(stage, data_dir, args.workers))
+                results["runs"].append(run)
+                print(f"{stage:<8} {size:>6} distributors: {run.get('wall_s')} s, "
+                      f"peak RSS {run.get('peak_rss_mb')} MB{'' if run['ok'] else ' (FAILED)'}")
+    finally:
+        if not args.keep_data:
+            shutil.rmtree(root, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
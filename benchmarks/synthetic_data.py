@@ -0,0 +1,124 @@
+"""
+Synthetic dump workbooks and plan file for benchmarking, e.g.
+
+    python benchmarks/synthetic_data.py data --distributors 1000 --items 12 --files 20
+
+Writes <folder>/dump/dump_NNN.xlsx and <folder>/plan.xlsx with the columns
+modified_excel reads. The same arguments and seed always give the same data.
+"""
+import argparse
+import os
+import random
+
+from openpyxl import Workbook
+
+DUMP_HEADER = [
+    "Distributor code",
+    "Item Type",
+    "Item Name",
+    "Item QTY As Per book Stock",
+    "Total Physical Stock",
+    "Remarks",
+]
+PLAN_HEADER = [
+    "Code Of DB",
+    "Name of DB",
+    "Zone",
+    "Unit",
+    "Address 1",
+    "Address 2",
+    "District",
+    "State Name",
+    "Audit Team Lead",
+    "Contact No",
+    "Date of Audit",
+]
+
+ITEM_TYPES = ["CSD", "Maaza", "Juice", "Soda", "Water", "Milk", "Others"]
+ZONES = ["North", "South", "East", "West"]
+REMARKS = [None, None, None, "Short", "Excess", "Damaged in transit"]
+FIRST_CODE = 100001
+
+
+def _write_rows(path, header, rows):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append(header)
+    for row in rows:
+        ws.append(row)
+    wb.save(path)
+
+
+def generate_dataset(folder, distributors=100, items=10, files=None, unplanned=0.02, seed=0):
+    """
+    Write a synthetic dump folder and plan file.
+
+    ``distributors`` are spread evenly over ``files`` dump workbooks (one per
+    50 distributors by default), each with ``items`` item rows. A fraction
+    ``unplanned`` of the codes in the dumps is left out of the plan file,
+    like distributors that were not planned for audit.
+
+    Returns (dump folder, plan file).
+    """
+    rng = random.Random(seed)
+    files = files or max(1, -(-distributors // 50))
+    dump_folder = os.path.join(folder, "dump")
+    os.makedirs(dump_folder, exist_ok=True)
+
+    codes = list(range(FIRST_CODE, FIRST_CODE + distributors))
+    plan_rows = []
+    for index, code in enumerate(codes):
+        if rng.random() < unplanned:
+            continue
+        zone = ZONES[index % len(ZONES)]
+        plan_rows.append([
+            code,
+            f"{code}-Distributor {code}",
+            zone,
+            f"{zone} Unit {index % 3 + 1}",
+            f"{index} Market Road",
+            "Near Bus Stand",
+            f"District {index % 40}",
+            f"State {index % 12}",
+            f"Auditor {index % 25}",
+            9000000000 + index,
+            f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d}",
+        ])
+    _write_rows(os.path.join(folder, "plan.xlsx"), PLAN_HEADER, plan_rows)
+
+    per_file = -(-distributors // files)
+    for file_index in range(files):
+        rows = []
+        for code in codes[file_index * per_file:(file_index + 1) * per_file]:
+            for item in range(items):
+                book_stock = rng.randint(0, 500)
+                rows.append([
+                    code,
+                    rng.choice(ITEM_TYPES),
+                    f"Item {item:03d}",
+                    book_stock,
+                    max(0, book_stock + rng.randint(-120, 40)),
+                    rng.choice(REMARKS),
+                ])
+        _write_rows(os.path.join(dump_folder, f"dump_{file_index:03d}.xlsx"), DUMP_HEADER, rows)
+
+    return dump_folder, os.path.join(folder, "plan.xlsx")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic dump and plan workbooks.")
+    parser.add_argument("folder", help="output folder")
+    parser.add_argument("--distributors", type=int, default=100)
+    parser.add_argument("--items", type=int, default=10, help="item rows per distributor")
+    parser.add_argument("--files", type=int, default=None, help="dump workbooks (default: one per 50 distributors)")
+    parser.add_argument("--unplanned", type=float, default=0.02, help="fraction of codes missing from the plan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    dump_folder, plan_file = generate_dataset(
+        args.folder, args.distributors, args.items, args.files, args.unplanned, args.seed
+    )
+    print(f"Dump files: {dump_folder}\nPlan file: {plan_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Command-line entry point for report and summary generation without any
+dialog, e.g. for scheduled batch runs on a headless server:
+
+    python cli.py report --dump DUMPS --plan plan.xlsx --output out.xlsx [--summary]
+    python cli.py report --dump MORE_DUMPS --plan plan.xlsx --output out.xlsx --append
+    python cli.py summary out.xlsx [--upsert]
+    python cli.py report --dump DUMPS --plan plan.xlsx --shard-by zone --output-dir shards [--summary]
+    python cli.py cache [--clear]
+
+Progress messages go to stderr; stdout lists the produced files, one per
+line. tkinter is never imported. --log-level, --log-file and -v control
+app.log (see app_logging.configure_logging).
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+from contextlib import redirect_stdout
+
+from app_logging import configure_logging
+
+# Exit codes
+EXIT_OK = 0
+EXIT_REPORT_FAILED = 1
+EXIT_USAGE = 2  # argparse errors
+EXIT_SUMMARY_FAILED = 3
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="cli.py",
+        description="Generate HCCB distributor audit reports and summaries without the GUI.",
+    )
+    parser.add_argument("--log-level", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper,
+                        help="app.log verbosity (default: $HCCB_LOG_LEVEL or INFO)")
+    parser.add_argument("--log-file", metavar="FILE",
+                        help="log file (default: $HCCB_LOG_FILE or app.log next to the scripts)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="log per-distributor DEBUG records and echo the log to stderr")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="render report sections from dump files")
+    report.add_argument("--dump", action="append", required=True, metavar="FOLDER",
+                        help="folder of dump files (repeat for several folders)")
+    report.add_argument("--plan", required=True, metavar="FILE", help="plan (distributor data) workbook")
+    report.add_argument("--output", metavar="FILE",
+                        help="output workbook (default for a new file: template_copy_<timestamp>.xlsx)")
+    report.add_argument("--append", action="store_true", help="append to the existing --output file")
+    report.add_argument("--workers", type=int, default=1,
+                        help="processes parsing dump files (0 = one per CPU, default 1)")
+    report.add_argument("--no-cache", action="store_true",
+                        help="parse every dump file instead of loading earlier parses from the parse cache")
+    report.add_argument("--streaming", action="store_true",
+                        help="write a new output file in write-only mode (lower memory)")
+    report.add_argument("--shard-by", metavar="zone|unit|N",
+                        help="write one workbook per Zone or Unit, or per N reports, in parallel")
+    report.add_argument("--output-dir", default=".", metavar="FOLDER",
+                        help="folder for the shard workbooks (default: current folder)")
+    report.add_argument("--summary", action="store_true",
+                        help="also build the Summary Report sheet in the same run and save "
+                             "(one consolidated summary workbook for shards)")
+    _add_summary_options(report)
+
+    summary = commands.add_parser("summary", help="add the Summary Report sheet to a report workbook")
+    summary.add_argument("output", metavar="FILE", help="report workbook")
+    _add_summary_options(summary)
+
+    cache = commands.add_parser("cache", help="show or clear the parse cache of dump files")
+    cache.add_argument("--clear", action="store_true", help="delete every cached parse")
+    return parser
+
+
+def _add_summary_options(parser):
+    parser.add_argument("--upsert", action="store_true",
+                        help="refresh reports already in the summary instead of skipping them")
+    parser.add_argument("--full-rescan", action="store_true",
+                        help="re-read every report section, ignoring the section index")
+
+
+def run_report(args):
+    """Run the report stage; returns (output path or None, whether a fused summary was written)."""
+    import modified_excel
+
+    workers = None if args.workers == 0 else args.workers
+    result = modified_excel.select_excel_files(
+        dump_folder=args.dump,
+        plan_file=args.plan,
+        workers=workers,
+        streaming=args.streaming,
+        output_file=args.output,
+        create_new=not args.append,
+        use_cache=not args.no_cache,
+        summary=fused_summary(args),
+        summary_upsert=args.upsert,
+    )
+    return result if fused_summary(args) else (result, False)
+
+
+def fused_summary(args):
+    """--summary is built in the report run itself, unless --full-rescan asks for a separate full pass."""
+    return args.summary and not args.full_rescan
+
+
+def run_sharded_report(args):
+    """Run the report stage into shards; returns (shard files, summary file or None) or None."""
+    import sharded_output
+
+    workers = None if args.workers == 0 else args.workers
+    return sharded_output.generate_sharded_reports(
+        dump_folder=args.dump,
+        plan_file=args.plan,
+        shard_by=args.shard_by,
+        output_dir=args.output_dir,
+        workers=workers,
+        streaming=args.streaming,
+        summary=args.summary,
+        use_cache=not args.no_cache,
+    )
+
+
+def run_summary(output_file, args):
+    """Run the summary stage on a report workbook; returns its path or None."""
+    import summary_report_tool
+
+    return summary_report_tool.extract_distributor_data(
+        output_file, full_rescan=args.full_rescan, upsert=args.upsert
+    )
+
+
+def run_cache(args):
+    """Show the parse cache's location and size, or clear it."""
+    from parse_cache import ParseCache
+
+    cache = ParseCache()
+    if args.clear:
+        files, size = cache.clear()
+        print(f"Parse cache cleared: {files} files, {size / 2**20:.1f} MB removed from {cache.folder}")
+    else:
+        entries = cache.entries()
+        size = sum(entry[1] for entry in entries)
+        print(f"Parse cache: {len(entries)} files, {size / 2**20:.1f} MB of {cache.max_bytes / 2**20:.0f} MB in {cache.folder}")
+    return EXIT_OK
+
+
+def _main_sharded(args, produced):
+    with redirect_stdout(sys.stderr):
+        result = run_sharded_report(args)
+    if not result or not result[0]:
+        return EXIT_REPORT_FAILED, produced
+    shard_files, summary_file = result
+    produced.extend(os.path.abspath(f) for f in shard_files)
+    if args.summary:
+        if not summary_file:
+            return EXIT_SUMMARY_FAILED, produced
+        produced.append(os.path.abspath(summary_file))
+    return EXIT_OK, produced
+
+
+def main(argv=None):
+    """Run the CLI; returns (exit code, produced file paths)."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    configure_logging(
+        level="DEBUG" if args.verbose else args.log_level, log_file=args.log_file, console=args.verbose,
+    )
+    produced = []
+
+    if args.command == "cache":
+        return run_cache(args), produced
+    if args.command == "report":
+        if args.append and not args.output:
+            parser.error("--append needs --output")
+        if args.append and args.streaming:
+            parser.error("--streaming only creates new files")
+        for folder in args.dump:
+            if not os.path.isdir(folder):
+                parser.error(f"dump folder not found: {folder}")
+        if not os.path.isfile(args.plan):
+            parser.error(f"plan file not found: {args.plan}")
+        if args.append and not os.path.isfile(args.output):
+            parser.error(f"output file not found: {args.output}")
+        if args.shard_by is not None:
+            if args.append or args.output:
+                parser.error("--shard-by writes new files to --output-dir; drop --append/--output")
+            shard_by = args.shard_by.lower()
+            if shard_by not in ("zone", "unit") and not (shard_by.isdigit() and int(shard_by) > 0):
+                parser.error("--shard-by must be zone, unit or a positive number of reports")
+            return _main_sharded(args, produced)
+
+        # The pipeline reports progress with print(); keep stdout for the results
+        with redirect_stdout(sys.stderr):
+            output_file, summary_written = run_report(args)
+        if not output_file:
+            return EXIT_REPORT_FAILED, produced
+        produced.append(os.path.abspath(output_file))
+        if not args.summary:
+            return EXIT_OK, produced
+        if fused_summary(args):
+            return (EXIT_OK if summary_written else EXIT_SUMMARY_FAILED), produced
+    else:
+        if not os.path.isfile(args.output):
+            parser.error(f"report file not found: {args.output}")
+        output_file = args.output
+
+    with redirect_stdout(sys.stderr):
+        summary_file = run_summary(output_file, args)
+    if not summary_file:
+        return EXIT_SUMMARY_FAILED, produced
+    if os.path.abspath(summary_file) not in produced:
+        produced.append(os.path.abspath(summary_file))
+    return EXIT_OK, produced
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    exit_code, produced_files = main()
+    for path in produced_files:
+        print(path)
+    sys.exit(exit_code)
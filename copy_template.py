@@ -1,8 +1,209 @@
+import os
+import weakref
 from copy import copy
 
 from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
+from openpyxl.cell.cell import Cell, MergedCell
+from openpyxl.worksheet.cell_range import CellRange
+
+
+def cell_style_objects(cell):
+    """Return (font, fill, border, alignment, protection, number_format) of a styled cell."""
+    wb = cell.parent.parent
+    style_array = cell._style
+    return (
+        wb._fonts[style_array.fontId],
+        wb._fills[style_array.fillId],
+        wb._borders[style_array.borderId],
+        wb._alignments[style_array.alignmentId],
+        wb._protections[style_array.protectionId],
+        cell.number_format,
+    )
+
+
+def register_style(ws, style_objects):
+    """Register style objects in the workbook of ``ws`` and return the style array to assign."""
+    font, fill, border, alignment, protection, number_format = style_objects
+    probe = Cell(ws)
+    probe.font = font
+    probe.fill = fill
+    probe.border = border
+    probe.alignment = alignment
+    probe.protection = protection
+    probe.number_format = number_format
+    return copy(probe._style)
+
+
+class TemplateStamp:
+    """
+    A template sheet parsed once into values, style ids, merge offsets and
+    dimensions, so it can be stamped at any row offset of another sheet.
+
+    Style objects are registered in a target workbook the first time the
+    stamp is used with it; after that, stamping a section only assigns
+    precomputed style arrays to the new cells.
+    """
+
+    # Sheet-level layout carried over to sheets that are not copies of the template
+    SHEET_SETTINGS = ("sheet_properties", "sheet_format", "page_margins", "print_options")
+
+    def __init__(self, template_ws):
+        self.title = template_ws.title
+        self.n_rows = template_ws.max_row
+
+        self.styles = []  # (font, fill, border, alignment, protection, number_format)
+        style_ids = {}
+
+        # (row offset, column, value, style id or None, is merged cell)
+        self.cells = []
+        for row in template_ws.iter_rows():
+            for cell in row:
+                is_merged = isinstance(cell, MergedCell)
+                if cell.value is None and not cell.has_style and not is_merged:
+                    continue
+                style_id = None
+                if cell.has_style:
+                    style_array = cell._style
+                    key = tuple(style_array)
+                    style_id = style_ids.get(key)
+                    if style_id is None:
+                        style_id = style_ids[key] = len(self.styles)
+                        self.styles.append(cell_style_objects(cell))
+                self.cells.append(
+                    (cell.row - 1, cell.column, None if is_merged else cell.value, style_id, is_merged)
+                )
+
+        # (min_col, min_row offset, max_col, max_row offset)
+        self.merges = [
+            (r.min_col, r.min_row - 1, r.max_col, r.max_row - 1)
+            for r in template_ws.merged_cells.ranges
+        ]
+        self.column_widths = {
+            col: dim.width for col, dim in template_ws.column_dimensions.items()
+        }
+        self.row_heights = {
+            row - 1: dim.height for row, dim in template_ws.row_dimensions.items()
+        }
+
+        # Lowercased label text -> (row offset, column) of its first occurrence
+        self.label_offsets = {}
+        for row_off, column, value, _, _ in self.cells:
+            if value:
+                self.label_offsets.setdefault(str(value).strip().lower(), (row_off, column))
+
+        self.sheet_settings = {
+            name: copy(getattr(template_ws, name)) for name in self.SHEET_SETTINGS
+        }
+        self.page_setup = {
+            name: getattr(template_ws.page_setup, name)
+            for name in template_ws.page_setup.__attrs__
+        }
+
+        # target workbook -> style arrays registered in that workbook
+        self._registered = weakref.WeakKeyDictionary()
+
+    def _style_arrays(self, ws):
+        wb = ws.parent
+        arrays = self._registered.get(wb)
+        if arrays is None:
+            arrays = [register_style(ws, style) for style in self.styles]
+            self._registered[wb] = arrays
+        return arrays
+
+    def apply_sheet_settings(self, ws):
+        """Give ``ws`` the template's page setup, margins, print options and column widths."""
+        for name, value in self.sheet_settings.items():
+            setattr(ws, name, copy(value))
+        for name, value in self.page_setup.items():
+            setattr(ws.page_setup, name, value)
+        for col, width in self.column_widths.items():
+            ws.column_dimensions[col].width = width
+
+    def stamp(self, ws, start_row=1):
+        """Write the template into ``ws`` with its first row at ``start_row``."""
+        arrays = self._style_arrays(ws)
+        shift = start_row
+        cells = ws._cells
+
+        for row_off, column, value, style_id, is_merged in self.cells:
+            row = row_off + shift
+            if is_merged:
+                new_cell = MergedCell(ws, row=row, column=column)
+                cells[(row, column)] = new_cell
+            else:
+                new_cell = ws.cell(row=row, column=column, value=value)
+            if style_id is not None:
+                new_cell._style = copy(arrays[style_id])
+
+        # New sections never overlap existing merges, so skip the linear
+        # containment check of MultiCellRange.add. Plain CellRanges are
+        # enough for saving and avoid MergedCellRange's border lookups.
+        merged_ranges = ws.merged_cells.ranges
+        for min_col, min_row, max_col, max_row in self.merges:
+            merged_ranges.add(CellRange(
+                min_col=min_col, min_row=min_row + shift,
+                max_col=max_col, max_row=max_row + shift,
+            ))
+
+        for col, width in self.column_widths.items():
+            ws.column_dimensions[col].width = width
+
+        for row_off, height in self.row_heights.items():
+            ws.row_dimensions[row_off + shift].height = height
+
+        return start_row
+
+
+# (absolute path, mtime) -> TemplateStamp, shared by every run in the process
+_stamp_cache = {}
+
+
+def load_template_stamp(template_file_path):
+    """Return the cached TemplateStamp for a template file, parsing it if it changed."""
+    path = os.path.abspath(template_file_path)
+    key = (path, os.path.getmtime(path))
+    stamp = _stamp_cache.get(key)
+    if stamp is None:
+        for stale in [k for k in _stamp_cache if k[0] == path]:
+            del _stamp_cache[stale]
+        stamp = _stamp_cache[key] = TemplateStamp(load_workbook(path).active)
+    return stamp
+
+
+def add_sheet_with_template_if_not_exists(
+    workbook,
+    template_file_path,
+    new_sheet_name="Summary Report",
+    position=None
+):
+    """
+    Adds a sheet with template formatting to an open workbook only if it
+    doesn't exist. Nothing is loaded or saved.
+    
+    Args:
+        workbook (Workbook): Open workbook to add the sheet to
+        template_file_path (str): Path to the template Excel file
+        new_sheet_name (str): Name for the new sheet
+        position (int): Optional position index for the new sheet
+        
+    Returns:
+        tuple: (created: bool, worksheet)
+    """
+    if new_sheet_name in workbook.sheetnames:
+        return (False, workbook[new_sheet_name])
+    
+    stamp = load_template_stamp(template_file_path)
+    
+    # Create new sheet at specified position or at end
+    if position is not None:
+        output_ws = workbook.create_sheet(title=new_sheet_name, index=position)
+    else:
+        output_ws = workbook.create_sheet(title=new_sheet_name)
+    
+    # Copy all content, formatting, merges and dimensions from template
+    stamp.stamp(output_ws, start_row=1)
+    
+    return (True, output_ws)
 
 
 def create_sheet_with_template_if_not_exists(
@@ -24,50 +225,14 @@ def create_sheet_with_template_if_not_exists(
         tuple: (success: bool, message: str, start_row: int)
     """
     try:
-        # Load both workbooks
-        template_wb = load_workbook(template_file_path)
-        template_ws = template_wb.active
         output_wb = load_workbook(existing_file_path)
         
-        # Check if sheet already exists
-        if new_sheet_name in output_wb.sheetnames:
+        created, _ = add_sheet_with_template_if_not_exists(
+            output_wb, template_file_path, new_sheet_name, position
+        )
+        if not created:
             return (False, f"Sheet '{new_sheet_name}' already exists", None)
         
-        # Create new sheet at specified position or at end
-        if position is not None:
-            output_ws = output_wb.create_sheet(title=new_sheet_name, index=position)
-        else:
-            output_ws = output_wb.create_sheet(title=new_sheet_name)
-        
-        # Copy all content and formatting from template
-        for row in template_ws.iter_rows():
-            for cell in row:
-                new_cell = output_ws.cell(
-                    row=cell.row, 
-                    column=cell.column, 
-                    value=cell.value
-                )
-                if cell.has_style:
-                    new_cell.font = copy(cell.font)
-                    new_cell.fill = copy(cell.fill)
-                    new_cell.border = copy(cell.border)
-                    new_cell.alignment = copy(cell.alignment)
-                    new_cell.number_format = cell.number_format
-
-        # Copy merged cells
-        for merged_cell_range in template_ws.merged_cells.ranges:
-            output_ws.merge_cells(str(merged_cell_range))
-        
-        # Copy column widths
-        for col in template_ws.column_dimensions:
-            output_ws.column_dimensions[col].width = \
-                template_ws.column_dimensions[col].width
-        
-        # Copy row heights
-        for row in template_ws.row_dimensions:
-            output_ws.row_dimensions[row].height = \
-                template_ws.row_dimensions[row].height
-        
         # Save the workbook
         output_wb.save(existing_file_path)
         
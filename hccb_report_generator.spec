@@ -20,7 +20,8 @@ a = Analysis(
         ('app_icon.ico', '.'),
         ('README.txt', '.'),
     ],
-    hiddenimports=['pandas', 'openpyxl', 'tkinter'],
+    # The engine modules are imported lazily by main_gui
+    hiddenimports=['pandas', 'openpyxl', 'tkinter', 'modified_excel', 'summary_report_tool', 'parse_cache', 'plan_snapshot'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -1,23 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
+import queue
 import threading
+import time
 import webbrowser
 from tkinter.scrolledtext import ScrolledText
 import logging
 import traceback
 import sys
+import multiprocessing
 
-import modified_excel
-import summary_report_tool
+import metrics
+from app_logging import configure_logging
+from progress import CancelToken
 
-# Setup logger
+# modified_excel and summary_report_tool pull in pandas and openpyxl, so they
+# are imported in the background once the window is up (_load_engine) and
+# not at module load; benchmarks/import_budget.py keeps it that way
+
+# Handlers are set up once by the entry point (app_logging.configure_logging)
 logger = logging.getLogger("AppLogger")
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler("app.log", encoding="utf-8")
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
 
 # Font definitions
 FONT_FAMILY = "Segoe UI Variable, Segoe UI, Calibri, Arial"
@@ -28,6 +31,12 @@ ENTRY_FONT = ("Segoe UI Variable", 12)
 BUTTON_FONT = ("Segoe UI Variable", 13, "bold")
 CONSOLE_FONT = ("Consolas", 12)
 FOOTER_FONT = ("Segoe UI Variable", 12, "bold")
+PROGRESS_FONT = ("Segoe UI Variable", 11)
+
+# Worker events are drained every POLL_MS; at most POLL_BATCH per tick so a
+# burst of events cannot stall the UI
+POLL_MS = 100
+POLL_BATCH = 200
 
 class PhenomenalGUI(tk.Tk):
     def __init__(self):
@@ -99,6 +108,20 @@ class PhenomenalGUI(tk.Tk):
         self.open_summary_btn = tk.Button(card, text="Open Summary Report", bg=BUTTON_BG, fg=BUTTON_FG, font=BUTTON_FONT, activebackground=BUTTON_ACTIVE, relief=tk.FLAT, command=self.open_summary_output, state=tk.DISABLED, padx=8, pady=8, bd=0, highlightthickness=0)
         self.open_summary_btn.grid(row=7, column=0, columnspan=2, sticky="ew", padx=10, pady=5)
 
+        # Progress of the running job
+        self.progress_bar = ttk.Progressbar(card, orient=tk.HORIZONTAL, mode="determinate", maximum=100)
+        self.progress_bar.grid(row=8, column=0, columnspan=2, sticky="ew", padx=10, pady=(20,2))
+        self.cancel_btn = tk.Button(card, text="Cancel", bg="#c0392b", fg=BUTTON_FG, font=BUTTON_FONT, activebackground="#922b21", relief=tk.FLAT, command=self.cancel_run, state=tk.DISABLED, padx=6, pady=4, bd=0, highlightthickness=0)
+        self.cancel_btn.grid(row=8, column=2, padx=(0,10), pady=(20,2))
+        self.progress_var = tk.StringVar(value="")
+        tk.Label(card, textvariable=self.progress_var, bg=CARD_BG, font=PROGRESS_FONT, anchor="w", justify=tk.LEFT).grid(row=9, column=0, columnspan=3, sticky="ew", padx=10, pady=(0,10))
+        self.clear_cache_btn = tk.Button(card, text="Clear Parse Cache", bg="#6c757d", fg=BUTTON_FG, font=PROGRESS_FONT, activebackground="#5a6268", relief=tk.FLAT, command=self.clear_parse_cache, padx=6, pady=2, bd=0, highlightthickness=0)
+        self.clear_cache_btn.grid(row=12, column=0, columnspan=3, sticky="w", padx=10, pady=(0,10))
+        self.fused_summary_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(card, text="Build the Summary Report with the report", variable=self.fused_summary_var, bg=CARD_BG, font=PROGRESS_FONT, activebackground=CARD_BG).grid(row=10, column=0, columnspan=3, sticky="w", padx=10, pady=(0,4))
+        self.upsert_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(card, text="Refresh existing Summary Report rows", variable=self.upsert_var, bg=CARD_BG, font=PROGRESS_FONT, activebackground=CARD_BG).grid(row=11, column=0, columnspan=3, sticky="w", padx=10, pady=(0,4))
+
         # Right: Console output
         console_card = tk.Frame(main, bg="#fff", bd=2, relief=tk.GROOVE, highlightbackground=CARD_BORDER, highlightthickness=1)
         console_card.grid(row=0, column=1, sticky="nsew", padx=(10,30), pady=30)
@@ -115,7 +138,7 @@ class PhenomenalGUI(tk.Tk):
         tk.Label(footer, text="Developed by Rishav Raj", bg=FOOTER_BG, fg=FOOTER_FG, font=FOOTER_FONT).pack(pady=2)
 
         # Status bar (optional)
-        self.status_var = tk.StringVar(value="Ready.")
+        self.status_var = tk.StringVar(value="Loading report engine...")
         status_bar = tk.Label(self, textvariable=self.status_var, font=("Segoe UI Variable", 11, "italic"), anchor="w", bg="#23272e", fg="#00ff99", padx=8, pady=4)
         status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
@@ -123,6 +146,17 @@ class PhenomenalGUI(tk.Tk):
         self.modified_output = None
         self.summary_output = None
 
+        # Worker threads never touch widgets; they queue calls and progress
+        # events that the Tk thread drains in _drain_events
+        self._events = queue.Queue()
+        self._ui_thread = threading.current_thread()
+        self._cancel_token = None
+        self._run_started = None
+        self.after(POLL_MS, self._drain_events)
+
+        self._engine_ready = threading.Event()
+        self.after_idle(lambda: threading.Thread(target=self._load_engine, daemon=True).start())
+
     def create_gui_layout(self):
         pass
 
@@ -148,11 +182,122 @@ class PhenomenalGUI(tk.Tk):
                 var.set(file)
         tk.Button(parent, text="Browse", bg="#007acc", fg="#fff", font=BUTTON_FONT, activebackground="#005999", relief=tk.FLAT, command=browse, padx=6, pady=4, bd=0, highlightthickness=0).grid(row=row, column=2, padx=(0,10), pady=4)
 
-    def log(self, message, level="info"):
+    def _load_engine(self):
+        """Import the report engine off the Tk thread and report readiness in the status bar."""
+        started = time.monotonic()
+        try:
+            import modified_excel  # noqa: F401
+            import summary_report_tool  # noqa: F401
+            message = f"Ready. Report engine loaded in {time.monotonic() - started:.1f} s."
+        except Exception as e:
+            logger.exception("Exception while loading the report engine")
+            message = f"Report engine failed to load: {e}"
+        finally:
+            self._engine_ready.set()
+        self._ui(self._engine_loaded, message)
+
+    def _engine_loaded(self, message):
+        # A run started meanwhile owns the status bar
+        if self._cancel_token is None:
+            self.status_var.set(message)
+        logger.info(message)
+
+    def _wait_for_engine(self):
+        if not self._engine_ready.is_set():
+            self.set_status("Waiting for the report engine to load...")
+            self._engine_ready.wait()
+
+    def _ui(self, func, *args, **kwargs):
+        """Run ``func`` on the Tk thread: now if called there, else on the next poll."""
+        if threading.current_thread() is self._ui_thread:
+            func(*args, **kwargs)
+        else:
+            self._events.put(("call", func, args, kwargs))
+
+    def _post_progress(self, event):
+        """Progress callback for the worker threads (see progress.ProgressReporter)."""
+        self._events.put(("progress", event))
+
+    def _drain_events(self):
+        latest = None
+        try:
+            for _ in range(POLL_BATCH):
+                kind, *payload = self._events.get_nowait()
+                if kind == "progress":
+                    # Only the newest progress event is worth drawing
+                    latest = payload[0]
+                else:
+                    func, args, kwargs = payload
+                    func(*args, **kwargs)
+        except queue.Empty:
+            pass
+        except Exception:
+            logger.exception("Exception in queued UI call")
+        if latest is not None and self._cancel_token is not None:
+            self._show_progress(latest)
+        self.after(POLL_MS, self._drain_events)
+
+    def _show_progress(self, event):
+        fraction = event.get("fraction")
+        if fraction is None:
+            if str(self.progress_bar["mode"]) != "indeterminate":
+                self.progress_bar.config(mode="indeterminate")
+                self.progress_bar.start(15)
+        else:
+            if str(self.progress_bar["mode"]) != "determinate":
+                self.progress_bar.stop()
+                self.progress_bar.config(mode="determinate")
+            self.progress_bar["value"] = fraction * 100
+
+        parts = [event.get("message") or ""]
+        if event.get("files_total"):
+            parts.append(f"Files {event['files_done']}/{event['files_total']}")
+        if event.get("distributors_done"):
+            parts.append(f"Distributors {event['distributors_done']}")
+        elapsed = time.monotonic() - self._run_started
+        if fraction and 0 < fraction < 1:
+            remaining = elapsed * (1 - fraction) / fraction
+            parts.append(f"ETA {int(remaining // 60)}:{int(remaining % 60):02d}")
+        self.progress_var.set("  |  ".join(part for part in parts if part))
+
+    def _start_run(self):
+        """Reset the progress widgets and lock the run buttons; returns the run's CancelToken."""
+        self._cancel_token = CancelToken()
+        self._run_started = time.monotonic()
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate", value=0)
+        self.progress_var.set("Starting...")
+        self.run_modified_btn.config(state=tk.DISABLED)
+        self.run_summary_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        return self._cancel_token
+
+    def _finish_run(self, message):
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate")
+        if message == "Done":
+            self.progress_bar["value"] = 100
+        elapsed = time.monotonic() - self._run_started
+        self.progress_var.set(f"{message} ({elapsed:.1f} s)")
+        self._cancel_token = None
+        self.run_modified_btn.config(state=tk.NORMAL)
+        self.run_summary_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+
+    def cancel_run(self):
+        if self._cancel_token is not None and not self._cancel_token.cancelled:
+            self._cancel_token.cancel()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.set_status("Cancelling after the current distributor...", level="warning")
+
+    def _append_console(self, text):
         self.console.config(state=tk.NORMAL)
-        self.console.insert(tk.END, message + "\n")
+        self.console.insert(tk.END, text + "\n")
         self.console.see(tk.END)
         self.console.config(state=tk.DISABLED)
+
+    def log(self, message, level="info"):
+        self._ui(self._append_console, message)
         if level == "error":
             logger.error(message)
         elif level == "warning":
@@ -160,8 +305,12 @@ class PhenomenalGUI(tk.Tk):
         else:
             logger.info(message)
 
+    def log_metrics(self, run_metrics):
+        """Show the per-stage timing summary of a run in the console pane."""
+        self._ui(self._append_console, "\n".join(run_metrics.summary_lines()))
+
     def set_status(self, message, level="info"):
-        self.status_var.set(message)
+        self._ui(self.status_var.set, message)
         self.log(message, level=level)
 
     def run_modified_excel(self):
@@ -170,32 +319,72 @@ class PhenomenalGUI(tk.Tk):
         if not dump_folder or not plan_file:
             messagebox.showerror("Missing Input", "Please select both the dump folder and plan file.")
             return
+        # Dialogs stay on the Tk thread, so the output choice is made before the run starts
+        create_new = messagebox.askquestion(
+            "Output Preference",
+            "Do you want to generate a new output file?\n\n"
+            "Select 'Yes' for new file\n"
+            "Select 'No' to append to existing file",
+        ) == "yes"
+        output_file = None
+        if not create_new:
+            output_file = filedialog.askopenfilename(title="Select Existing Output File", filetypes=[("Excel files", "*.xlsx")])
+            if not output_file:
+                return
         self.set_status("Running modified_excel.py...")
-        self.run_modified_btn.config(state=tk.DISABLED)
-        threading.Thread(target=self._run_modified_excel_thread, args=(dump_folder, plan_file)).start()
+        cancel = self._start_run()
+        threading.Thread(
+            target=self._run_modified_excel_thread,
+            args=(dump_folder, plan_file, create_new, output_file, cancel, self.fused_summary_var.get(), self.upsert_var.get()),
+            daemon=True,
+        ).start()
 
-    def _run_modified_excel_thread(self, dump_folder, plan_file):
+    def _run_modified_excel_thread(self, dump_folder, plan_file, create_new, output_file, cancel, summary=False, upsert=False):
+        outcome = "Failed"
         try:
+            self._wait_for_engine()
+            import modified_excel
+
             template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_template.xlsx")
             modified_excel.get_resource_path = lambda x: template_path if 'template' in x else x
+            if summary:
+                import summary_report_tool
+
+                summary_template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "summary_report_template.xlsx")
+                summary_report_tool.resource_path = lambda x: summary_template_path if 'template' in x else x
             self.set_status(f"Selected dump folder: {dump_folder}")
             self.set_status(f"Selected plan file: {plan_file}")
-            modified_excel.select_excel_files(dump_folder, plan_file)
-            files = [f for f in os.listdir('.') if f.startswith('template_copy_') and f.endswith('.xlsx')]
-            if files:
-                latest = max(files, key=os.path.getctime)
-                self.modified_output = os.path.abspath(latest)
-                self.open_modified_btn.config(state=tk.NORMAL)
-                self.set_status(f"Report Excel generated: {latest}")
+            run_metrics = metrics.RunMetrics("report")
+            result = modified_excel.select_excel_files(
+                dump_folder, plan_file, output_file=output_file, create_new=create_new,
+                run_metrics=run_metrics, progress=self._post_progress, cancel=cancel, summary=summary,
+                summary_upsert=upsert,
+            )
+            # With summary=True the run also says whether the Summary Report was written
+            output, summary_written = result if summary else (result, False)
+            self.log_metrics(run_metrics)
+            if cancel.cancelled:
+                outcome = "Cancelled"
+                self.set_status("Report generation cancelled. No output was saved.", level="warning")
+            elif output:
+                outcome = "Done"
+                self.modified_output = os.path.abspath(output)
+                self._ui(self.open_modified_btn.config, state=tk.NORMAL)
+                self.set_status(f"Report Excel generated: {os.path.basename(output)}")
+                if summary_written:
+                    self.summary_output = self.modified_output
+                    self._ui(self.open_summary_btn.config, state=tk.NORMAL)
+                elif summary:
+                    self.set_status("The Summary Report could not be built; see the log.", level="warning")
             else:
                 self.set_status("No output file generated.")
         except Exception as e:
             err_msg = f"Error: {e}\n{traceback.format_exc()}"
             self.set_status(err_msg, level="error")
-            messagebox.showerror("Error", str(e))
+            self._ui(messagebox.showerror, "Error", str(e))
             logger.exception("Exception in run_modified_excel thread")
         finally:
-            self.run_modified_btn.config(state=tk.NORMAL)
+            self._ui(self._finish_run, outcome)
 
     def open_modified_output(self):
         try:
@@ -212,25 +401,59 @@ class PhenomenalGUI(tk.Tk):
             messagebox.showerror("Missing Output", "Please generate the modified Excel first.")
             return
         self.set_status("Running summary_report_tool.py...")
-        self.run_summary_btn.config(state=tk.DISABLED)
-        threading.Thread(target=self._run_summary_report_thread, args=(self.modified_output,)).start()
+        cancel = self._start_run()
+        threading.Thread(
+            target=self._run_summary_report_thread, args=(self.modified_output, cancel, self.upsert_var.get()), daemon=True,
+        ).start()
 
-    def _run_summary_report_thread(self, modified_file):
+    def _run_summary_report_thread(self, modified_file, cancel, upsert=False):
+        outcome = "Failed"
         try:
+            self._wait_for_engine()
+            import summary_report_tool
+
             template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "summary_report_template.xlsx")
             summary_report_tool.resource_path = lambda x: template_path if 'template' in x else x
             self.set_status(f"Selected modified file: {modified_file}")
-            summary_report_tool.extract_distributor_data(modified_file)
-            self.summary_output = modified_file
-            self.open_summary_btn.config(state=tk.NORMAL)
-            self.set_status(f"Summary Report generated: {os.path.basename(modified_file)}")
+            run_metrics = metrics.RunMetrics("summary")
+            result = summary_report_tool.extract_distributor_data(
+                modified_file, upsert=upsert, run_metrics=run_metrics, progress=self._post_progress, cancel=cancel,
+            )
+            self.log_metrics(run_metrics)
+            if cancel.cancelled:
+                outcome = "Cancelled"
+                self.set_status("Summary generation cancelled. The workbook was not changed.", level="warning")
+            elif result:
+                outcome = "Done"
+                self.summary_output = modified_file
+                self._ui(self.open_summary_btn.config, state=tk.NORMAL)
+                self.set_status(f"Summary Report generated: {os.path.basename(modified_file)}")
+            else:
+                self.set_status("Summary Report could not be generated.", level="error")
         except Exception as e:
             err_msg = f"Error: {e}\n{traceback.format_exc()}"
             self.set_status(err_msg, level="error")
-            messagebox.showerror("Error", str(e))
+            self._ui(messagebox.showerror, "Error", str(e))
             logger.exception("Exception in run_summary_report thread")
         finally:
-            self.run_summary_btn.config(state=tk.NORMAL)
+            self._ui(self._finish_run, outcome)
+
+    def clear_parse_cache(self):
+        """Delete the cached dump parses, so the next run parses every file again."""
+        self.clear_cache_btn.config(state=tk.DISABLED)
+        threading.Thread(target=self._clear_parse_cache_thread, daemon=True).start()
+
+    def _clear_parse_cache_thread(self):
+        try:
+            from parse_cache import ParseCache
+
+            files, size = ParseCache().clear()
+            self.set_status(f"Parse cache cleared: {files} files, {size / 2**20:.1f} MB removed.")
+        except Exception as e:
+            self.set_status(f"Could not clear the parse cache: {e}", level="error")
+            logger.exception("Exception in clear_parse_cache")
+        finally:
+            self._ui(self.clear_cache_btn.config, state=tk.NORMAL)
 
     def open_summary_output(self):
         try:
@@ -243,5 +466,8 @@ class PhenomenalGUI(tk.Tk):
             logger.exception("Exception in open_summary_output")
 
 if __name__ == "__main__":
+    # Needed by the dump-parsing process pool in the frozen executable
+    multiprocessing.freeze_support()
+    configure_logging()
     app = PhenomenalGUI()
     app.mainloop() 
\ No newline at end of file
@@ -0,0 +1,137 @@
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime
+
+# RunMetrics of the run in progress in this thread, if any
+_active = ContextVar("run_metrics", default=None)
+
+
+class RunMetrics:
+    """
+    Timing spans of one pipeline run.
+
+    Every span records a stage name, its duration and the file and
+    distributor being processed, so a run can be broken down by stage, by
+    dump file and by distributor. Spans are kept in memory and can be
+    written as JSON lines.
+    """
+
+    def __init__(self, pipeline="report"):
+        self.pipeline = pipeline
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.spans = []
+        self._context = {}
+        self._started = time.perf_counter()
+        self.wall_seconds = None
+
+    @contextmanager
+    def activate(self):
+        """Make this the collector that span() and record() report to."""
+        token = _active.set(self)
+        try:
+            yield self
+        finally:
+            _active.reset(token)
+            self.wall_seconds = time.perf_counter() - self._started
+
+    @contextmanager
+    def scope(self, **context):
+        """Attach ``context`` (e.g. file=..., distributor=...) to spans recorded inside."""
+        previous = self._context
+        self._context = dict(previous, **context)
+        try:
+            yield
+        finally:
+            self._context = previous
+
+    def record(self, stage, seconds, **context):
+        span = dict(self._context, **context)
+        span["stage"] = stage
+        span["seconds"] = seconds
+        self.spans.append(span)
+
+    def stage_totals(self):
+        """stage -> (total seconds, count, max seconds), in order of first appearance."""
+        totals = {}
+        for span in self.spans:
+            total, count, longest = totals.get(span["stage"], (0.0, 0, 0.0))
+            totals[span["stage"]] = (total + span["seconds"], count + 1, max(longest, span["seconds"]))
+        return totals
+
+    def totals_by(self, key):
+        """Value of ``key`` (e.g. "file") -> total seconds of its spans."""
+        totals = {}
+        for span in self.spans:
+            value = span.get(key)
+            if value is not None:
+                totals[value] = totals.get(value, 0.0) + span["seconds"]
+        return totals
+
+    def summary_lines(self, top=5):
+        """Human-readable run summary: time per stage, slowest files and distributors."""
+        lines = [f"Timing summary ({self.pipeline}):"]
+        if self.wall_seconds is not None:
+            lines.append(f"  wall time {self.wall_seconds:.2f} s")
+        for stage, (total, count, longest) in self.stage_totals().items():
+            lines.append(f"  {stage:<16} {total:8.2f} s  ({count} x, max {longest:.3f} s)")
+        for key, title in (("file", "Slowest files"), ("distributor", "Slowest distributors")):
+            slowest = sorted(self.totals_by(key).items(), key=lambda item: item[1], reverse=True)[:top]
+            if slowest:
+                lines.append(f"  {title}:")
+                lines.extend(f"    {value}: {seconds:.2f} s" for value, seconds in slowest)
+        return lines
+
+    def write_jsonl(self, path):
+        """Append the spans and a summary line to a JSON-lines file."""
+        with open(path, "a", encoding="utf-8") as f:
+            for span in self.spans:
+                f.write(json.dumps(dict(span, run=self.run_id, pipeline=self.pipeline), default=str) + "\n")
+            f.write(json.dumps({
+                "run": self.run_id,
+                "pipeline": self.pipeline,
+                "summary": {
+                    "wall_seconds": self.wall_seconds,
+                    "stages": {
+                        stage: {"seconds": total, "count": count, "max_seconds": longest}
+                        for stage, (total, count, longest) in self.stage_totals().items()
+                    },
+                },
+            }, default=str) + "\n")
+        return path
+
+
+def metrics_path(output_file):
+    """JSON-lines metrics file next to an output workbook: report.xlsx -> report.metrics.jsonl"""
+    return os.path.splitext(output_file)[0] + ".metrics.jsonl"
+
+
+@contextmanager
+def span(stage, **context):
+    """Time the enclosed block as ``stage`` in the active RunMetrics (no-op without one)."""
+    metrics = _active.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.record(stage, time.perf_counter() - start, **context)
+
+
+def record(stage, seconds, **context):
+    """Record a duration measured elsewhere (e.g. in a worker process)."""
+    metrics = _active.get()
+    if metrics is not None:
+        metrics.record(stage, seconds, **context)
+
+
+def scope(**context):
+    """RunMetrics.scope of the active collector (no-op without one)."""
+    metrics = _active.get()
+    if metrics is None:
+        return nullcontext()
+    return metrics.scope(**context)
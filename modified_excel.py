@@ -1,30 +1,54 @@
 import os
 import shutil
-import tkinter as tk
-from copy import copy
 from datetime import datetime
-from tkinter import filedialog, messagebox
 import logging
+import time
 import traceback
+from copy import copy
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Font
-from openpyxl.utils import column_index_from_string, get_column_letter
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import MergedCell
+from openpyxl.utils import column_index_from_string
 import sys
-from openpyxl.styles import Border, Side
-from openpyxl.styles import PatternFill
+from openpyxl.worksheet.cell_range import CellRange
+
+import metrics
+from app_logging import configure_logging
+from copy_template import cell_style_objects, load_template_stamp, register_style
+from parse_cache import ParseCache, read_cached
+from plan_snapshot import load_plan_snapshot, snapshot_path
+from progress import ProgressReporter, RunCancelled
+from report_metadata import report_sheet, report_tail, write_report_metadata
+from report_styles import HEADER_VALUE_ALIGNMENT, get_style_registry
+from run_manifest import RunManifest, manifest_path
+from section_index import (
+    SECTION_MARKER,
+    SECTION_MAX_COL,
+    read_section_index,
+    sheet_section_fingerprint,
+    write_section_index,
+)
+from summary_report_tool import (
+    add_summary_sheet,
+    iter_distributor_records,
+    summarize_workbook,
+    write_summary_records,
+)
 
-# Logger setup
+# Handlers are set up once by the entry point (app_logging.configure_logging)
 logger = logging.getLogger("AppLogger")
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler("app.log", encoding="utf-8")
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-if not logger.hasHandlers():
-    logger.addHandler(file_handler)
 
+# tkinter is imported by the dialogs only, so headless runs (see cli.py) never load it
 def select_file(title="Select File", filetypes=[("Excel files", "*.xlsx")]):
+    import tkinter as tk
+    from tkinter import filedialog
+
     root = tk.Tk()
     root.withdraw()
     file_path = filedialog.askopenfilename(title=title, filetypes=filetypes)
@@ -32,6 +56,9 @@ def select_file(title="Select File", filetypes=[("Excel files", "*.xlsx")]):
 
 
 def select_folder(title="Select Folder"):
+    import tkinter as tk
+    from tkinter import filedialog
+
     root = tk.Tk()
     root.withdraw()
     folder_path = filedialog.askdirectory(title=title)
@@ -39,6 +66,9 @@ def select_folder(title="Select Folder"):
 
 
 def get_output_preference():
+    import tkinter as tk
+    from tkinter import messagebox
+
     root = tk.Tk()
     root.withdraw()
     result = messagebox.askquestion(
@@ -66,12 +96,19 @@ labels_with_column = {
     "Date of audit": ("date_of_audit", "L", "L:O"),
 }
 
+# Blank rows left between two report sections (+1 to start the next one)
+SECTION_GAP = 4
 
 
-def copy_template():
-    template_path = get_resource_path("report_template.xlsx")
+
+def new_output_filename():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    new_filename = f"template_copy_{timestamp}.xlsx"
+    return f"template_copy_{timestamp}.xlsx"
+
+
+def copy_template(new_filename=None):
+    template_path = get_resource_path("report_template.xlsx")
+    new_filename = new_filename or new_output_filename()
 
     if not os.path.exists(template_path):
         print(f"Template file not found at: {template_path}")
@@ -85,48 +122,20 @@ def copy_template():
     except Exception as e:
         print(f"Error copying file: {e}")
         return None
+
+
 def copy_template_to_existing_file(template_path, existing_output_path):
-    template_wb = load_workbook(template_path)
-    template_ws = template_wb.active
+    stamp = load_template_stamp(template_path)
 
     output_wb = load_workbook(existing_output_path)
-    output_ws = output_wb.active
-
-    # Step 1: Find the last used row
-    last_row = output_ws.max_row
-    new_start_row = last_row + 4  # 3 blank rows + 1 to start
-
-    # Step 2: Copy row by row
-    for row in template_ws.iter_rows():
-        target_row_idx = new_start_row + row[0].row - 1
-        for cell in row:
-            new_cell = output_ws.cell(
-                row=target_row_idx, column=cell.column, value=cell.value
-            )
-            if cell.has_style:
-                new_cell.font = copy(cell.font)
-                new_cell.fill = copy(cell.fill)
-                new_cell.border = copy(cell.border)
-                new_cell.alignment = copy(cell.alignment)
-                new_cell.number_format = cell.number_format
-
-    # Step 3: Copy merged cells
-    for merged_cell_range in template_ws.merged_cells.ranges:
-        min_col, min_row, max_col, max_row = merged_cell_range.bounds
-        shifted_range = f"{get_column_letter(min_col)}{min_row + new_start_row - 1}:{get_column_letter(max_col)}{max_row + new_start_row - 1}"
-        output_ws.merge_cells(shifted_range)
-
-    # Step 4: Copy column widths
-    for col in template_ws.column_dimensions:
-        output_ws.column_dimensions[col].width = template_ws.column_dimensions[
-            col
-        ].width
-
-    # Step 5: Copy row heights
-    for row_dim in template_ws.row_dimensions:
-        output_ws.row_dimensions[
-            new_start_row + row_dim - 1
-        ].height = template_ws.row_dimensions[row_dim].height
+    output_ws = report_sheet(output_wb, stamp)
+
+    # Find the last used row
+    last_report_number, last_row = report_tail(output_ws)
+    new_start_row = last_row + SECTION_GAP
+
+    stamp.stamp(output_ws, new_start_row)
+    write_report_metadata(output_wb, last_report_number, output_ws.max_row)
 
     output_wb.save(existing_output_path)
     # apply_thick_border_to_sections(existing_output_path)
@@ -135,69 +144,346 @@ def copy_template_to_existing_file(template_path, existing_output_path):
     return new_start_row
 
 
-# Add this function to sort the categories in the desired order
-def sort_categories(grouped_data):
-    # Define the desired order of categories
-    category_order = ['CSD', 'Maaza', 'Juice', 'Soda', 'Water', 'Milk', 'Others']
-    
-    # Create a dictionary to store the sorted groups
-    sorted_groups = {}
-    
-    # Add groups in the specified order
-    for category in category_order:
-        if category in grouped_data.groups:
-            sorted_groups[category] = grouped_data.get_group(category)
-    
-    # Add any remaining groups that weren't in our specified order
-    for category in grouped_data.groups:
-        if category not in sorted_groups:
-            sorted_groups[category] = grouped_data.get_group(category)
-    
-    return sorted_groups
+# Columns read from each dump file; all of them must be present
+DUMP_COLUMNS = [
+    "Distributor code",
+    "Item Type",
+    "Item Name",
+    "Item QTY As Per book Stock",
+    "Total Physical Stock",
+    "Remarks",
+]
+DUMP_NUMERIC_COLUMNS = ["Item QTY As Per book Stock", "Total Physical Stock"]
+DUMP_CATEGORY_COLUMNS = ["Distributor code", "Item Type"]
+
+# Columns read from the plan file; only the distributor code is mandatory
+PLAN_REQUIRED_COLUMNS = ["Code Of DB"]
+PLAN_OPTIONAL_COLUMNS = [
+    "Name of DB",
+    "Zone",
+    "Unit",
+    "Address 1",
+    "Address 2",
+    "District",
+    "State Name",
+    "Audit Team Lead",
+    "Contact No",
+    "Date of Audit",
+]
+
+
+def read_projected_columns(excel_file, required, optional=(), sheet_name=None):
+    """
+    Read only the named columns of a sheet into a DataFrame.
+
+    .xlsx files are streamed row by row through a read-only workbook; other
+    formats go through pandas with the same projection. Raises ValueError
+    naming the file and the columns when a required column is missing.
+    """
+    wanted = list(required) + list(optional)
+
+    if not excel_file.lower().endswith(".xlsx"):
+        df = pd.read_excel(
+            excel_file,
+            sheet_name=sheet_name or 0,
+            usecols=lambda c: str(c).strip() in wanted,
+        )
+        df.columns = [str(c).strip() for c in df.columns]
+        missing = [c for c in required if c not in df.columns]
+        if missing:
+            raise ValueError(f"{os.path.basename(excel_file)}: missing required column(s): {', '.join(missing)}")
+        return df
 
+    wb = load_workbook(excel_file, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name else wb.worksheets[0]
+        # Some exporters write a stale <dimension ref="A1"/>; read the real extent like pandas does
+        ws.reset_dimensions()
+        rows = ws.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+
+        positions = {}
+        for index, name in enumerate(header):
+            if name in wanted and name not in positions:
+                positions[name] = index
+        missing = [c for c in required if c not in positions]
+        if missing:
+            raise ValueError(f"{os.path.basename(excel_file)}: missing required column(s): {', '.join(missing)}")
+
+        names = list(positions)
+        indexes = [positions[name] for name in names]
+        data = {name: [] for name in names}
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i in indexes]
+            if all(v is None for v in values):
+                continue
+            for name, value in zip(names, values):
+                data[name].append(value)
+    finally:
+        wb.close()
 
-def find_and_fill(ws, label, column_letter, value, merge_range=None, start_row=1):
-    """Find row by label and fill value in fixed column and optionally merge."""
-    for row in ws.iter_rows(min_row=start_row):
-        for cell in row:
-            if cell.value and str(cell.value).strip().lower() == label.lower():
-                row_number = cell.row
+    return pd.DataFrame(data, columns=names)
 
-                if merge_range:
-                    start_col, end_col = merge_range.split(":")
-                    start_col_idx = column_index_from_string(start_col)
-                    end_col_idx = column_index_from_string(end_col)
-                    cell_range = f"{start_col}{row_number}:{end_col}{row_number}"
 
-                    if cell_range in ws.merged_cells.ranges:
-                        ws.unmerge_cells(cell_range)
+def read_dump_file(excel_file):
+    """Read the dump columns used by the report, with compact dtypes."""
+    df = read_projected_columns(excel_file, DUMP_COLUMNS)
+    for column in DUMP_NUMERIC_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    for column in DUMP_CATEGORY_COLUMNS:
+        df[column] = df[column].astype("category")
+    return df
 
-                    ws.merge_cells(cell_range)
-                    ws.cell(row=row_number, column=start_col_idx).value = value
-                    ws.cell(row=row_number, column=start_col_idx).alignment = Alignment(
-                        vertical="center", horizontal="left"
-                    )
-                else:
-                    ws[f"{column_letter}{row_number}"].value = value
 
-                return
+def read_plan_file(plan_file):
+    """Read the plan columns used by the report headers from Sheet1."""
+    return read_projected_columns(
+        plan_file, PLAN_REQUIRED_COLUMNS, PLAN_OPTIONAL_COLUMNS, sheet_name="Sheet1"
+    )
+
+
+# Product categories in the order they appear in every report
+CATEGORY_ORDER = ['CSD', 'Maaza', 'Juice', 'Soda', 'Water', 'Milk', 'Others']
+
+
+def normalize_code(code):
+    """Normalize a distributor code so that 1234, 1234.0 and "1234 " match"""
+    if code is None or (isinstance(code, float) and code != code):
+        return None
+    if isinstance(code, float) and code.is_integer():
+        code = int(code)
+    code = str(code).strip()
+    if code.endswith(".0") and code[:-2].isdigit():
+        code = code[:-2]
+    return code or None
+
+
+# Columns prepare_plan_frame() adds to the plan rows
+PLAN_CODE_KEY = "_code"
+PLAN_CUSTOMER_CODE_KEY = "_customer_code"
+PLAN_DISTRIBUTOR_NAME_KEY = "_distributor_name"
+
+
+def split_customer_name(name):
+    """Split "Name of DB" ("1234-Some Distributor") into customer code and distributor name."""
+    name = str(name)
+    if "-" in name:
+        number_part, string_part = name.split("-", 1)
+    else:
+        number_part = string_part = name
+    return number_part.strip(), string_part.strip()
+
+
+def prepare_plan_frame(plan_df):
+    """Add the normalized code and the split customer code and name to the plan rows."""
+    plan_df = plan_df.copy()
+    plan_df[PLAN_CODE_KEY] = [normalize_code(code) for code in plan_df["Code Of DB"].tolist()]
+    names = plan_df["Name of DB"].tolist() if "Name of DB" in plan_df.columns else [""] * len(plan_df)
+    parts = [split_customer_name(name) for name in names]
+    plan_df[PLAN_CUSTOMER_CODE_KEY] = [number_part for number_part, _ in parts]
+    plan_df[PLAN_DISTRIBUTOR_NAME_KEY] = [string_part for _, string_part in parts]
+    return plan_df
+
+
+def load_plan_index(plan_file):
+    """
+    PlanIndex of a plan file through its snapshot (see plan_snapshot):
+    the plan workbook is only parsed again after it changes.
+    """
+    schema = repr((PLAN_REQUIRED_COLUMNS, PLAN_OPTIONAL_COLUMNS, PLAN_CODE_KEY))
+    plan_df, source = load_plan_snapshot(
+        plan_file, lambda: prepare_plan_frame(read_plan_file(plan_file)), schema
+    )
+    if source == "memory":
+        print("Plan file unchanged; reusing the copy loaded earlier.")
+    elif source == "snapshot":
+        print(f"Plan file unchanged; loaded from {snapshot_path(plan_file)}")
+    return PlanIndex(plan_df)
+
+
+class PlanIndex:
+    """Plan file rows keyed by normalized "Code Of DB" (the first row wins)."""
+
+    def __init__(self, plan_df):
+        if PLAN_CODE_KEY not in plan_df.columns:
+            plan_df = prepare_plan_frame(plan_df)
+        self.plan_df = plan_df
+        self._positions = {}
+        for position, key in enumerate(plan_df[PLAN_CODE_KEY].tolist()):
+            if isinstance(key, str):
+                self._positions.setdefault(key, position)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def get(self, code):
+        """Return the plan row for ``code`` as a Series, or None if it is not planned."""
+        position = self._positions.get(normalize_code(code))
+        if position is None:
+            return None
+        return self.plan_df.iloc[position]
+
+
+def order_categories(categories):
+    """Fixed CATEGORY_ORDER first, then any other categories in sorted order."""
+    known = [c for c in CATEGORY_ORDER if c in categories]
+    others = sorted((c for c in categories if c not in CATEGORY_ORDER), key=str)
+    return known + others
+
+
+def group_dump_by_distributor(dump_df):
+    """
+    Group a dump in one pass.
+
+    Returns a dict of normalized distributor code -> list of
+    (item type, items DataFrame), with codes in order of first appearance
+    and item types in report order.
+    """
+    raw_codes = dump_df["Distributor code"]
+    mapping = {code: normalize_code(code) for code in pd.unique(raw_codes)}
+    codes = raw_codes.map(mapping)
+
+    grouped = {}
+    for (code, category), items in dump_df.groupby([codes, "Item Type"], sort=False, observed=True):
+        grouped.setdefault(code, {})[category] = items
+
+    return {
+        code: [(category, blocks[category]) for category in order_categories(blocks)]
+        for code, blocks in grouped.items()
+    }
+
+
+def join_distributor_reports(grouped_dump, plan_index):
+    """
+    Yield (code, plan row or None, category blocks) for every distributor of
+    a grouped dump, in the order the reports should be written.
+    """
+    for code, category_blocks in grouped_dump.items():
+        yield code, plan_index.get(code), category_blocks
+
+
+def load_dump_file(excel_file):
+    """Parse one dump workbook and group its rows by distributor."""
+    return group_dump_by_distributor(read_dump_file(excel_file))
+
+
+def dump_parse_cache():
+    """ParseCache for dump files, keyed to the columns and dtypes read_dump_file() produces."""
+    return ParseCache(schema=repr((DUMP_COLUMNS, DUMP_NUMERIC_COLUMNS, DUMP_CATEGORY_COLUMNS)))
+
+
+def _load_dump_file_isolated(excel_file, cache_file=None):
+    """
+    Worker entry point: never raises, so one bad file cannot stop the others.
+    Also returns the time spent parsing (or loading from ``cache_file``)
+    and grouping, measured in the worker.
+    """
+    try:
+        start = time.perf_counter()
+        if cache_file:
+            dump_df, hit = read_cached(cache_file, lambda: read_dump_file(excel_file))
+        else:
+            dump_df, hit = read_dump_file(excel_file), False
+        parsed = time.perf_counter()
+        grouped_dump = group_dump_by_distributor(dump_df)
+        timings = {"cache load" if hit else "dump parse": parsed - start, "join": time.perf_counter() - parsed}
+        return excel_file, grouped_dump, None, timings
+    except Exception as e:
+        return excel_file, None, f"{e}\n{traceback.format_exc()}", {}
+
+
+def iter_dump_files(excel_files, workers=1, cache=None):
+    """
+    Yield (file, grouped dump or None, error or None) for every dump file,
+    in the order of ``excel_files``.
+
+    With ``workers`` > 1 the files are parsed in that many worker processes
+    while the results are still consumed in the original order, so report
+    numbering matches a serial run. ``workers=None`` uses every CPU.
+    With a ParseCache, files parsed before are loaded from it instead.
+    """
+    cache_files = [None] * len(excel_files)
+    if cache is not None:
+        try:
+            cache_files = [cache.entry(excel_file) for excel_file in excel_files]
+        except OSError as e:
+            logger.warning(f"Parse cache not used: {e}")
+            cache = None
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(excel_files))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        if pool is None:
+            results = map(_load_dump_file_isolated, excel_files, cache_files)
+        else:
+            results = pool.map(_load_dump_file_isolated, excel_files, cache_files)
+        for excel_file, grouped_dump, error, timings in results:
+            _record_timings(excel_file, timings)
+            yield excel_file, grouped_dump, error
+    finally:
+        if pool is not None:
+            # Drop queued files when the consumer stops early, e.g. a cancelled run
+            if sys.version_info >= (3, 9):
+                pool.shutdown(cancel_futures=True)
+            else:
+                # Python 3.8 has no cancel_futures; queued files still finish
+                pool.shutdown()
+        if cache is not None:
+            try:
+                cache.save()
+            except OSError as e:
+                logger.warning(f"Could not update the parse cache: {e}")
+
+
+def _record_timings(excel_file, timings):
+    for stage, seconds in timings.items():
+        metrics.record(stage, seconds, file=excel_file)
+
+
+@lru_cache(maxsize=8)
+def get_header_layout(stamp):
+    """
+    Resolve every header label of the report template to the cell its value
+    goes into, as (data key, row offset from the section start, column index,
+    merge range or None when the template already merges it).
+    """
+    template_merges = set(stamp.merges)
+    layout = []
+    for label, (key, column_letter, merge_range) in labels_with_column.items():
+        found = stamp.label_offsets.get(label.lower())
+        if found is None:
+            logger.warning(f"Label '{label}' not found in report template")
+            continue
+        row_off = found[0]
+        if merge_range:
+            start_col, end_col = (column_index_from_string(c) for c in merge_range.split(":"))
+            merge = (start_col, row_off, end_col, row_off)
+            layout.append((key, row_off, start_col, None if merge in template_merges else merge))
+        else:
+            layout.append((key, row_off, column_index_from_string(column_letter), None))
+    return tuple(layout)
+
 
+def fill_header_section(ws, matched_row, report_number, start_row=1, stamp=None):
+    """Fill the header cells of the report section starting at ``start_row``"""
+    if stamp is None:
+        stamp = load_template_stamp(get_resource_path("report_template.xlsx"))
 
-def fill_header_section(ws, matched_row, report_number, start_row=1):
-    """Fill headers dynamically based on label names"""
-    customer_name = str(matched_row.get("Name of DB", ""))
-    if "-" in customer_name:
-        number_part, string_part = customer_name.split("-", 1)
+    if PLAN_CUSTOMER_CODE_KEY in matched_row:
+        number_part = matched_row[PLAN_CUSTOMER_CODE_KEY]
+        string_part = matched_row[PLAN_DISTRIBUTOR_NAME_KEY]
     else:
-        number_part = string_part = customer_name
+        number_part, string_part = split_customer_name(matched_row.get("Name of DB", ""))
 
     # Create a dictionary with default values for all fields
     distributor_data = {
         "report_number": report_number,
         "zone": matched_row.get("Zone", ""),
         "unit": matched_row.get("Unit", ""),  # Default empty string if Unit not found
-        "customer_code": number_part.strip(),
-        "distributor_name": string_part.strip(),
+        "customer_code": number_part,
+        "distributor_name": string_part,
         "address1": matched_row.get("Address 1", ""),
         "address2": matched_row.get("Address 2", ""),
         "city_state": f"{matched_row.get('District', '')}, {matched_row.get('State Name', '')}",
@@ -207,10 +493,16 @@ def fill_header_section(ws, matched_row, report_number, start_row=1):
         "date_of_audit": matched_row.get("Date of Audit", ""),
     }
 
-    for label, (key, column, merge_range) in labels_with_column.items():
-        find_and_fill(
-            ws, label, column, distributor_data.get(key, ""), merge_range, start_row
-        )
+    for key, row_off, column, merge in get_header_layout(stamp):
+        row_number = start_row + row_off
+        if merge:
+            ws.merge_cells(
+                start_row=row_number, start_column=merge[0],
+                end_row=row_number, end_column=merge[2],
+            )
+        cell = ws.cell(row=row_number, column=column)
+        cell.value = distributor_data.get(key, "")
+        cell.alignment = HEADER_VALUE_ALIGNMENT
 
 
 def get_excel_files_from_folder(folder_path):
@@ -222,20 +514,441 @@ def get_excel_files_from_folder(folder_path):
     return excel_files
 
 
-def calculate_column_sum(ws, column_letter, start_row, end_row):
-    """Calculate sum of a column between specified rows"""
-    total = 0
-    col_idx = column_index_from_string(column_letter)
-
-    for row in range(start_row, end_row + 1):
-        cell_value = ws.cell(row=row, column=col_idx).value
-        if isinstance(cell_value, (int, float)):
-            total += cell_value
+def _cell_values(series):
+    """Column values as plain Python objects, with missing values left empty."""
+    return [None if pd.isna(value) else value for value in series.tolist()]
+
+
+def compute_section_values(category_blocks):
+    """
+    Compute the item rows of one report section column-wise.
+
+    Returns (columns, totals): ``columns`` maps a sheet column index to the
+    list of values for the item rows, ``totals`` maps a sheet column index
+    to its Grand Total.
+    """
+    items = pd.concat([block for _, block in category_blocks], ignore_index=True)
+    categories = []
+    for category, block in category_blocks:
+        categories.append(category)
+        categories.extend([None] * (len(block) - 1))
+
+    book_stock = pd.to_numeric(items["Item QTY As Per book Stock"], errors="coerce")
+    physical_stock = pd.to_numeric(items["Total Physical Stock"], errors="coerce")
+
+    a = book_stock.fillna(0).to_numpy(dtype=float)
+    f = physical_stock.fillna(0).to_numpy(dtype=float)
+    # B, C, D, G and H are not part of the dump and stay blank in the report
+    b = c = d = g = h = np.zeros(len(items))
+
+    e = a + b - c - d
+    i = f + g + h
+    j = np.abs(e - i)
+
+    columns = {
+        2: categories,
+        3: _cell_values(items["Item Name"]),
+        4: _cell_values(items["Item QTY As Per book Stock"]),
+        8: e.tolist(),
+        10: _cell_values(items["Total Physical Stock"]),
+        13: i.tolist(),
+        14: j.tolist(),
+        15: _cell_values(items["Remarks"]),
+    }
+    totals = {
+        4: book_stock.sum().item(),
+        8: e.sum().item(),
+        10: physical_stock.sum().item(),
+        13: i.sum().item(),
+        14: j.sum().item(),
+    }
+    return columns, totals
+
+
+def write_report_section(ws, matched_row, report_number, new_start_row, category_blocks, stamp=None):
+    """Fill one report section whose template starts at ``new_start_row``.
+
+    Returns the row of the section's Grand Total line.
+    """
+    # Fill header section with current report number
+    with metrics.span("header fill"):
+        fill_header_section(ws, matched_row, report_number, new_start_row, stamp)
+
+    with metrics.span("data compute"):
+        columns, totals = compute_section_values(category_blocks)
+    data_start_row = new_start_row + len(labels_with_column) + 2
+
+    data_first_row = new_start_row + len(labels_with_column) + 1  # First data row
+    data_last_row = data_start_row + len(columns[2]) - 1  # Last data row (before Grand Total)
+    grand_total_row = data_last_row + 1
+
+    # Borders, alignment and font for the data block and Grand Total row
+    # (columns B to O), with the dark divider in column I
+    styles = get_style_registry(ws)
+    with metrics.span("styling"):
+        styles.apply_range(ws, "report_cell", data_first_row, grand_total_row, 2, 15)
+        styles.apply_range(ws, "report_divider", data_first_row, grand_total_row, 9, 9)
+
+    with metrics.span("data write"):
+        # Fill item data
+        for column, values in columns.items():
+            numeric = column in (8, 13, 14)
+            for row_number, value in enumerate(values, data_start_row):
+                if value is not None:
+                    cell = ws.cell(row=row_number, column=column, value=value)
+                    if numeric:
+                        styles.apply(cell, "report_number")
+
+        # Add grand total for this report
+        ws.cell(row=grand_total_row, column=2).value = "Grand Total"
+
+        # Grand totals for this report only
+        for column, total in totals.items():
+            styles.apply(ws.cell(row=grand_total_row, column=column, value=total), "report_number")
+
+    return grand_total_row
+
+
+def section_marker_offset(stamp):
+    """Row offset of the section marker ("Distributor Audit Report") in the report template."""
+    return stamp.label_offsets[SECTION_MARKER.lower()][0]
+
+
+def section_row_count(category_blocks):
+    """Rows of a report section from its first template row to its Grand Total row."""
+    item_rows = sum(len(block) for _, block in category_blocks)
+    return len(labels_with_column) + 2 + item_rows + 1
+
+
+def clear_rows(ws, first_row, last_row):
+    """Remove every cell, merge and row height of rows ``first_row``..``last_row``."""
+    cells = ws._cells
+    for key in [key for key in cells if first_row <= key[0] <= last_row]:
+        del cells[key]
+    merged_ranges = ws.merged_cells.ranges
+    merged_ranges.difference_update([
+        merged for merged in merged_ranges
+        if merged.min_row <= last_row and merged.max_row >= first_row
+    ])
+    for row in range(first_row, last_row + 1):
+        ws.row_dimensions.pop(row, None)
+
+
+class ReportWriter:
+    """
+    In-memory output: every report section is stamped into one open
+    worksheet and the workbook is saved once at the end of the run.
+    """
+
+    def __init__(self, output_file, wb, stamp, next_start_row=1, template_in_place=False,
+                 section_index=None, last_report_number=0):
+        self.output_file = output_file
+        self.wb = wb
+        self.ws = report_sheet(wb, stamp)
+        self.stamp = stamp
+        self.next_start_row = next_start_row
+        # Tail of the sheet, stored in the workbook metadata on save
+        self.last_report_number = last_report_number
+        self.last_row = self.ws.max_row
+        # A fresh template copy already holds the layout for the first report
+        self.template_in_place = template_in_place
+        # Report number -> row range and fingerprint; None leaves the file unindexed
+        self.section_index = section_index
+
+    def add_section(self, matched_row, report_number, category_blocks):
+        """Write one report section; returns (first row, Grand Total row)."""
+        start_row = self.next_start_row
+        if self.template_in_place:
+            self.template_in_place = False
+        else:
+            with metrics.span("template stamp"):
+                self.stamp.stamp(self.ws, start_row)
 
-    return total
+        grand_total_row = write_report_section(
+            self.ws, matched_row, report_number, start_row, category_blocks, self.stamp
+        )
+        self.next_start_row = grand_total_row + SECTION_GAP
+        self.last_report_number = max(self.last_report_number, report_number)
+        self.last_row = grand_total_row
+
+        self._index_section(report_number, start_row, grand_total_row)
+        return start_row, grand_total_row
+
+    def replace_section(self, matched_row, report_number, category_blocks):
+        """
+        Regenerate an indexed report section, keeping its report number.
+
+        A section with as many rows as before is rewritten in place;
+        otherwise the old rows are cleared and the section is written after
+        the last one. Returns (first row, Grand Total row), or None when the
+        report is not in the section index.
+        """
+        entry = (self.section_index or {}).get(str(report_number))
+        if entry is None:
+            return None
+
+        start_row = entry["start"] - section_marker_offset(self.stamp)
+        clear_rows(self.ws, start_row, entry["end"])
+        if section_row_count(category_blocks) != entry["end"] - start_row + 1:
+            return self.add_section(matched_row, report_number, category_blocks)
+
+        with metrics.span("template stamp"):
+            self.stamp.stamp(self.ws, start_row)
+        grand_total_row = write_report_section(
+            self.ws, matched_row, report_number, start_row, category_blocks, self.stamp
+        )
+        self._index_section(report_number, start_row, grand_total_row)
+        return start_row, grand_total_row
+
+    def _index_section(self, report_number, start_row, grand_total_row):
+        if self.section_index is not None:
+            marker_row = start_row + section_marker_offset(self.stamp)
+            self.section_index[str(report_number)] = {
+                "start": marker_row,
+                "end": grand_total_row,
+                "fingerprint": sheet_section_fingerprint(self.ws, marker_row, grand_total_row),
+            }
+
+    def save(self):
+        if self.section_index is not None:
+            write_section_index(self.wb, self.section_index)
+        write_report_metadata(self.wb, self.last_report_number, self.last_row)
+        self.wb.save(self.output_file)
+
+
+class StreamingReportWriter:
+    """
+    Write-only output for very large runs.
+
+    Each section is rendered into a scratch sheet, emitted row by row to a
+    write-only worksheet together with its styles, merges and row heights,
+    and then dropped, so memory depends on one section rather than on the
+    whole run. Only new output files can be written this way.
+
+    With ``summary=True`` the summary record of every section is read from
+    its scratch sheet as it is rendered, and save() adds the Summary Report
+    sheet from those records. If that fails, ``summary_error`` is set and
+    the report is written without it.
+    """
+
+    def __init__(self, output_file, stamp, summary=False):
+        self.output_file = output_file
+        self.stamp = stamp
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet(stamp.title)
+        stamp.apply_sheet_settings(self.ws)
+
+        self._scratch_wb = Workbook()
+        self._styles = {}  # scratch style array -> output style array
+        self.last_row = 0
+        self.last_report_number = 0
+        self.section_index = {}
+        self.summary_records = [] if summary else None
+        self.summary_error = None
+
+    def _output_cell(self, cell, ws=None):
+        if cell.value is None and not cell.has_style:
+            return None
+        value = None if isinstance(cell, MergedCell) else cell.value
+        out = WriteOnlyCell(ws or self.ws, value=value)
+        if cell.has_style:
+            key = tuple(cell._style)
+            style = self._styles.get(key)
+            if style is None:
+                style = self._styles[key] = register_style(self.ws, cell_style_objects(cell))
+            out._style = copy(style)
+        return out
+
+    def add_section(self, matched_row, report_number, category_blocks):
+        """Write one report section; returns (first row, Grand Total row)."""
+        start_row = 1 if self.last_row == 0 else self.last_row + SECTION_GAP
+        while self.last_row < start_row - 1:
+            self.ws.append([])
+            self.last_row += 1
+
+        scratch = self._scratch_wb.create_sheet()
+        try:
+            with metrics.span("template stamp"):
+                self.stamp.stamp(scratch, 1)
+            section_rows = write_report_section(
+                scratch, matched_row, report_number, 1, category_blocks, self.stamp
+            )
 
+            with metrics.span("stream write"):
+                shift = start_row - 1
+                merged_ranges = self.ws.merged_cells.ranges
+                for merged in scratch.merged_cells.ranges:
+                    merged_ranges.add(CellRange(
+                        min_col=merged.min_col, min_row=merged.min_row + shift,
+                        max_col=merged.max_col, max_row=merged.max_row + shift,
+                    ))
+
+                heights = scratch.row_dimensions
+                for row in scratch.iter_rows(min_row=1, max_row=section_rows):
+                    out_row = row[0].row + shift
+                    if row[0].row in heights and heights[row[0].row].height:
+                        self.ws.row_dimensions[out_row].height = heights[row[0].row].height
+                    self.ws.append([self._output_cell(cell) for cell in row])
+                    # The row is on disk now; its dimensions are no longer needed
+                    self.ws.row_dimensions.pop(out_row, None)
+
+            marker_offset = section_marker_offset(self.stamp)
+            entry = self.section_index[str(report_number)] = {
+                "start": start_row + marker_offset,
+                "end": start_row + section_rows - 1,
+                "fingerprint": sheet_section_fingerprint(scratch, marker_offset + 1, section_rows),
+            }
+            if self.summary_records is not None:
+                try:
+                    with metrics.span("summary parse"):
+                        rows = scratch.iter_rows(
+                            min_row=marker_offset + 1, max_row=section_rows,
+                            max_col=SECTION_MAX_COL, values_only=True,
+                        )
+                        self.summary_records.extend(iter_distributor_records(rows, first_row=entry["start"]))
+                    entry["summarized"] = entry["fingerprint"]
+                except Exception as e:
+                    self._drop_summary(e)
+        finally:
+            self._scratch_wb.remove(scratch)
+
+        self.last_row = start_row + section_rows - 1
+        self.last_report_number = report_number
+        return start_row, self.last_row
+
+    def replace_section(self, matched_row, report_number, category_blocks):
+        """Rows on disk cannot be rewritten; returns None so the report is added as a new section."""
+        return None
 
-def select_excel_files(dump_folder=None, plan_file=None):
+    def _write_summary_sheet(self):
+        """Stream a Summary Report sheet of the collected records in front of the report sheet."""
+        scratch = add_summary_sheet(self._scratch_wb)
+        try:
+            with metrics.span("summary write"):
+                write_summary_records(scratch, self.summary_records)
+                out = self.wb.create_sheet(scratch.title, 0)
+                # Column widths must be set before the first row is written
+                for key, dimension in scratch.column_dimensions.items():
+                    if dimension.width:
+                        out.column_dimensions[key].width = dimension.width
+                for merged in scratch.merged_cells.ranges:
+                    out.merged_cells.ranges.add(CellRange(merged.coord))
+                heights = scratch.row_dimensions
+                for row in scratch.iter_rows():
+                    if row[0].row in heights and heights[row[0].row].height:
+                        out.row_dimensions[row[0].row].height = heights[row[0].row].height
+                    out.append([self._output_cell(cell, out) for cell in row])
+        finally:
+            self._scratch_wb.remove(scratch)
+
+    def _drop_summary(self, error):
+        """Give up on the Summary Report after ``error``; the report is still written."""
+        logger.exception(f"Summary Report failed: {error}")
+        self.summary_error = error
+        self.summary_records = None
+        for entry in self.section_index.values():
+            entry.pop("summarized", None)
+
+    def save(self):
+        if self.summary_records is not None:
+            try:
+                self._write_summary_sheet()
+            except Exception as e:
+                if "Summary Report" in self.wb.sheetnames:
+                    self.wb.remove(self.wb["Summary Report"])
+                self._drop_summary(e)
+        write_section_index(self.wb, self.section_index)
+        write_report_metadata(self.wb, self.last_report_number, self.last_row)
+        self.wb.save(self.output_file)
+
+
+def summarize_report(wb, section_index, upsert, reporter):
+    """
+    Build the Summary Report of an open report workbook (see
+    summarize_workbook). Returns whether it was built; on failure a
+    Summary Report sheet this call created is removed again.
+    """
+    had_summary = "Summary Report" in wb.sheetnames
+    try:
+        added, updated = summarize_workbook(
+            wb, section_index, upsert=upsert,
+            reporter=ProgressReporter(reporter.callback, reporter.cancel, stage="summary"),
+        )
+    except RunCancelled:
+        raise
+    except Exception as e:
+        logger.exception(f"Summary Report failed: {e}\n{traceback.format_exc()}")
+        print(f"Error building the Summary Report: {str(e)}")
+        if not had_summary and "Summary Report" in wb.sheetnames:
+            wb.remove(wb["Summary Report"])
+        return False
+    print(f"Summary Report updated with {added} new records ({updated} refreshed).")
+    return True
+
+
+def pending_dump_files(manifest, excel_files):
+    """
+    Split off the dump files a run has to parse.
+
+    Returns (new or changed files, file -> signature for RunManifest.record).
+    """
+    pending_files, signatures = [], {}
+    for excel_file in excel_files:
+        status, signatures[excel_file] = manifest.check(excel_file)
+        if status == "unchanged":
+            print(f"Skipping unchanged file: {excel_file}")
+        else:
+            pending_files.append(excel_file)
+    return pending_files, signatures
+
+
+def select_excel_files(dump_folder=None, plan_file=None, workers=1, streaming=False,
+                       output_file=None, create_new=None, run_metrics=None,
+                       progress=None, cancel=None, use_cache=True, summary=False,
+                       summary_upsert=False):
+    """
+    Render one report section per matched distributor into one output workbook.
+
+    Arguments left as None are asked for with dialogs. ``workers`` parse
+    dump files in parallel, ``streaming`` writes a new file write-only,
+    ``use_cache`` reuses parsed dump files, and appending skips dump files
+    unchanged since the last run. ``progress``/``cancel`` report and stop
+    the run, and its timings go to ``run_metrics`` and <output>.metrics.jsonl.
+    ``summary`` also builds the Summary Report (``summary_upsert`` is its
+    upsert); a failed summary does not cost the report.
+
+    Returns the output path, or None when nothing was generated; with
+    ``summary=True``, (that path, whether the Summary Report was written).
+    """
+    run_metrics = run_metrics if run_metrics is not None else metrics.RunMetrics("report")
+    summary_status = {"written": False}
+    with run_metrics.activate():
+        output_file = _select_excel_files(
+            dump_folder, plan_file, workers, streaming, output_file, create_new,
+            ProgressReporter(progress, cancel, stage="report"), use_cache, summary, summary_upsert,
+            summary_status,
+        )
+    report_run_metrics(run_metrics, output_file)
+    if summary:
+        return output_file, summary_status["written"]
+    return output_file
+
+
+def report_run_metrics(run_metrics, output_file):
+    """Print and log the timing summary of a run and save its spans next to the output."""
+    for line in run_metrics.summary_lines():
+        print(line)
+        logger.info(line)
+    if output_file:
+        try:
+            run_metrics.write_jsonl(metrics.metrics_path(output_file))
+        except OSError as e:
+            logger.warning(f"Could not write run metrics: {e}")
+
+
+def _select_excel_files(dump_folder, plan_file, workers, streaming, output_file, create_new, reporter,
+                        use_cache, summary, summary_upsert, summary_status):
+    created_file = dumps = None
     try:
         # Use provided dump folder or prompt for selection
         df1_folder = dump_folder if dump_folder else select_folder(title="Select Folder containing ExampleFiles")
@@ -249,298 +962,182 @@ def select_excel_files(dump_folder=None, plan_file=None):
             print("No Distributor Data file selected. Exiting...")
             return
 
-        # Load the distributor data
-        df2 = pd.read_excel(df2_path, "Sheet1")
+        # Load the distributor data, keyed by distributor code
+        with metrics.span("plan load"):
+            plan_index = load_plan_index(df2_path)
 
-        # Get all Excel files from the selected folder
-        excel_files = get_excel_files_from_folder(df1_folder)
+        # Get all Excel files from the selected folder(s)
+        folders = [df1_folder] if isinstance(df1_folder, (str, os.PathLike)) else list(df1_folder)
+        excel_files = [f for folder in folders for f in get_excel_files_from_folder(folder)]
         if not excel_files:
             print("No Excel files found in the selected folder. Exiting...")
             return
 
         # Get output preference
-        create_new = get_output_preference()
+        if create_new is None:
+            create_new = get_output_preference()
+
+        stamp = load_template_stamp(get_resource_path("report_template.xlsx"))
 
-        output_file = None
-        
-        if create_new:
-            output_file = copy_template()  # Store in output_file instead of new_file
+        if create_new and streaming:
+            output_file = output_file or new_output_filename()
+            writer = StreamingReportWriter(output_file, stamp, summary=summary)
+            current_report_number = 1
+            manifest = RunManifest(manifest_path(output_file))
+            pending_files, signatures = pending_dump_files(manifest, excel_files)
+            print(f"New file created (streaming): {output_file}")
+        elif create_new:
+            output_file = created_file = copy_template(output_file)
             print(f"New file created: {output_file}")
             if not output_file:
                 return
-            wb = load_workbook(output_file)
-            ws = wb.active
+            writer = ReportWriter(
+                output_file, load_workbook(output_file), stamp,
+                template_in_place=True, section_index={},
+            )
             current_report_number = 1
-            new_start_row = 1
+            manifest = RunManifest(manifest_path(output_file))
+            pending_files, signatures = pending_dump_files(manifest, excel_files)
         else:
-            output_file = select_file(title="Select Existing Output File")  # Store in output_file
-            wb = load_workbook(output_file)
-            ws = wb.active
-
-            # Find the highest existing report number
-            existing_numbers = []
-            for row in ws.iter_rows():
-                for cell in row:
-                    if cell.value and str(cell.value).strip() == "Report Number":
-                        report_num_cell = ws.cell(row=cell.row, column=4)
-                        if isinstance(report_num_cell.value, (int, float)):
-                            existing_numbers.append(int(report_num_cell.value))
-            current_report_number = max(existing_numbers) + 1 if existing_numbers else 1
+            if streaming:
+                print("Streaming output only creates new files; appending in memory.")
+            output_file = output_file or select_file(title="Select Existing Output File")
+            if not output_file:
+                print("No output file selected. Exiting...")
+                return
+
+            # Only dump files that are new or changed since the last run are
+            # parsed; when there are none the output is not even opened
+            manifest = RunManifest.load(output_file)
+            pending_files, signatures = pending_dump_files(manifest, excel_files)
+            if not pending_files:
+                print("No new or changed files to process.")
+                if summary:
+                    # Nothing to render, but the summary may be missing or behind
+                    with metrics.span("output load"):
+                        wb = load_workbook(output_file)
+                    summary_status["written"] = summarize_report(wb, None, summary_upsert, reporter)
+                    if summary_status["written"]:
+                        with metrics.span("save"):
+                            wb.save(output_file)
+                return output_file
+
+            with metrics.span("output load"):
+                wb = load_workbook(output_file)
+
+            # Last report number and row from the workbook metadata, or a
+            # scan of the report labels for files written without it
+            last_report_number, last_row = report_tail(report_sheet(wb, stamp))
+            current_report_number = last_report_number + 1
+            # Files written before section indexing stay unindexed, so the
+            # summary keeps scanning them in full
+            writer = ReportWriter(
+                output_file, wb, stamp, next_start_row=last_row + SECTION_GAP,
+                section_index=read_section_index(wb), last_report_number=last_report_number,
+            )
             print(f"Existing file selected: {output_file}")
 
-        # Process each Excel file in the folder
-        for file_index, excel_file in enumerate(excel_files):
+        reporter.files_total = len(pending_files)
+        reporter.update("Reading dump files", 0.0, force=True)
 
-            
+        # Process each Excel file in the folder
+        dumps = iter_dump_files(pending_files, workers, dump_parse_cache() if use_cache else None)
+        for file_index, (excel_file, grouped_dump, error) in enumerate(dumps):
+            reporter.files_done = file_index
+            print(
+                f"\nProcessing file {file_index + 1} of {len(pending_files)}: {excel_file}"
+            )
+            reporter.update(
+                f"File {file_index + 1} of {len(pending_files)}: {os.path.basename(excel_file)}",
+                reporter.file_fraction(),
+            )
+            if error:
+                logger.error(f"Error processing file {excel_file}: {error}")
+                print(f"Error processing file {excel_file}: {error.splitlines()[0]}")
+                continue
 
             try:
-                print(
-                    f"\nProcessing file {file_index + 1} of {len(excel_files)}: {excel_file}"
-                )
-                df1 = pd.read_excel(excel_file)
-
-                # Find all unique distributor codes in this file
-                unique_codes = df1["Distributor code"].unique()
-                print(f"Found distributor codes: {unique_codes}")
-
-                # Track if we found any matching codes
-                found_any_match = False
-
-                for code in unique_codes:
-                    match = df2[df2["Code Of DB"] == code]
-
-                    if not match.empty:
-                        found_any_match = True
-                        matched_row = match.iloc[0]
-
-                        print(f"Processing distributor code: {code}")
-
-                        # For all files after the first one OR when appending to existing file,
-                        # we need to copy the template format
-                        if file_index > 0 or not create_new:
-                            # Copy template format for the new report section
-                            base_dir = os.path.dirname(os.path.abspath(__file__))
-                            template_path = os.path.join(base_dir, "report_template.xlsx")
-                            new_start_row = copy_template_to_existing_file(
-                                template_path, output_file  # Use output_file here
-                            )
-                            wb = load_workbook(output_file)  # Use output_file here
-                            ws = wb.active
-
-                        # Fill header section with current report number
-                        fill_header_section(
-                            ws, matched_row, current_report_number, new_start_row
-                        )
-
-                        # Get data for this distributor
-                        distributor_data = df1[df1["Distributor code"] == code]
-                        grouped_data = distributor_data.groupby("Item Type")
-                        # Sort the categories in the desired order
-                        sorted_groups = sort_categories(grouped_data)
-                        data_start_row = new_start_row + len(labels_with_column) + 2
-
-                        # Fill item data
-                        for category, items in sorted_groups.items():
-                            #import ipdb;ipdb.set_trace()
-                            ws.cell(row=data_start_row, column=2).value = category
-                            for _, row in items.iterrows():
-                                ws.cell(row=data_start_row, column=3).value = row[
-                                    "Item Name"
-                                ]
-                                
-                                ws.cell(row=data_start_row, column=4).value = row[
-                                    "Item QTY As Per book Stock"
-                                ]
-                                
-                                ws.cell(row=data_start_row, column=10).value = row[
-                                    "Total Physical Stock"
-                                ]
-                                
-                                ws.cell(row=data_start_row, column=15).value = row[
-                                    "Remarks"
-                                ]
-
-                                
-
-                                a_val = float(
-                                    ws.cell(row=data_start_row, column=4).value or 0
-                                )
-                                
-                                b_val = float(
-                                    ws.cell(row=data_start_row, column=5).value or 0
-                                )
-                                
-                                c_val = float(
-                                    ws.cell(row=data_start_row, column=6).value or 0
-                                )
-                                
-                                d_val = float(
-                                    ws.cell(row=data_start_row, column=7).value or 0
-                                )
-                                
-                                f_val = float(
-                                    ws.cell(row=data_start_row, column=9).value or 0
-                                )
-                                
-                                g_val = float(
-                                    ws.cell(row=data_start_row, column=10).value or 0
-                                )
-                                
-                                h_val = float(
-                                    ws.cell(row=data_start_row, column=11).value or 0
-                                )
-                                
-
-                                e_result = a_val + b_val - c_val - d_val
-                                ws.cell(row=data_start_row, column=8).value = e_result
-                                
-
-                                i_result = f_val + g_val + h_val
-                                ws.cell(row=data_start_row, column=13).value = i_result
-                                
-
-                                j_result = e_result - i_result
-                                ws.cell(row=data_start_row, column=14).value = abs(
-                                    j_result
-                                )
-                                
-
-                                ws.cell(
-                                    row=data_start_row, column=8
-                                ).number_format = "#,##0"
-                                ws.cell(
-                                    row=data_start_row, column=13
-                                ).number_format = "#,##0"
-                                ws.cell(
-                                    row=data_start_row, column=14
-                                ).number_format = "#,##0"
-
-                                data_start_row += 1
-
-
-                        # ===== PUT THE BORDER CODE HERE =====
-                        data_first_row = new_start_row + len(labels_with_column) + 1  # First data row
-                        data_last_row = data_start_row - 1  # Last data row (before Grand Total)
-                        grand_total_row = data_start_row
-                        black = '000000'  
-                        thin_border = Border(
-                            left=Side(style='thin', color=black),
-                            right=Side(style='thin', color=black),
-                            top=Side(style='thin', color=black),
-                            bottom=Side(style='thin', color=black)
-)
-
-                        # Apply borders to all data cells (columns B to N)
-                        for row in ws.iter_rows(min_row=data_first_row, max_row=data_last_row, min_col=2, max_col=15):  # Columns B to N
-                            for cell in row:
-                                cell.border = thin_border
-                                cell.alignment = Alignment(horizontal='center')
-                                cell.font = Font(bold=True)
-                        # import ipdb;ipdb.set_trace()   
-
-
-                        # Apply borders to grand total row (columns B, D, H, J, M, N)
-                        total_cols = [2,3, 4,5,6,7,8,9,10,11,12,13,14,15]  # B, D, H, J, M, N
-                        for col in total_cols:
-                            cell = ws.cell(row=grand_total_row, column=col)
-                            cell.border = thin_border
-                            cell.alignment = Alignment(horizontal='center')
-                            cell.font = Font(bold=True)
-                        
-                        #Apply background color to 'I' column
-                        for row in ws.iter_rows(min_row=data_first_row, max_row=data_last_row+1, min_col=9, max_col=9):
-                            for cell in row:
-                                cell.fill = PatternFill("solid", fgColor="222B35")
-
-
-
-
-
-                        print(f"Checking borders for cell B{data_first_row}:", ws[f'B{data_first_row}'].border)
-                        wb.save(output_file)
-                        print(f"Borders applied from row {data_first_row} to {data_last_row}")
-
-                        # Add grand total for this report
-                        ws.cell(row=grand_total_row, column=2).value = "Grand Total"
-
-                        # Calculate sums for this report only using the new function
-                        ws.cell(
-                            row=grand_total_row, column=4
-                        ).value = calculate_column_sum(
-                            ws,
-                            "D",
-                            new_start_row + len(labels_with_column) + 2,
-                            data_start_row - 1,
-                        )
-                        ws.cell(
-                            row=grand_total_row, column=8
-                        ).value = calculate_column_sum(
-                            ws,
-                            "H",
-                            new_start_row + len(labels_with_column) + 2,
-                            data_start_row - 1,
-                        )
-                        ws.cell(
-                            row=grand_total_row, column=10
-                        ).value = calculate_column_sum(
-                            ws,
-                            "J",
-                            new_start_row + len(labels_with_column) + 2,
-                            data_start_row - 1,
-                        )
-                        ws.cell(
-                            row=grand_total_row, column=13
-                        ).value = calculate_column_sum(
-                            ws,
-                            "M",
-                            new_start_row + len(labels_with_column) + 2,
-                            data_start_row - 1,
-                        )
-                        ws.cell(
-                            row=grand_total_row, column=14
-                        ).value = calculate_column_sum(
-                            ws,
-                            "N",
-                            new_start_row + len(labels_with_column) + 2,
-                            data_start_row - 1,
-                        )
+                # Reports rendered from an earlier version of this file are regenerated
+                previous_reports = manifest.reports(excel_file)
+                reports = {}
+                # Per-distributor messages are debug records; the file gets one summary line
+                skipped = []
+                regenerated = 0
+
+                joined = join_distributor_reports(grouped_dump, plan_index)
+                for done_in_file, (code, matched_row, category_blocks) in enumerate(joined, 1):
+                    if matched_row is None:
+                        skipped.append(code)
+                        continue
+
+                    report_number = previous_reports.get(code)
+                    with metrics.scope(file=excel_file, distributor=code):
+                        if report_number is not None and writer.replace_section(
+                            matched_row, report_number, category_blocks
+                        ):
+                            regenerated += 1
+                            logger.debug("Regenerated report %s for distributor code %s", report_number, code)
+                        else:
+                            report_number = current_report_number
+                            writer.add_section(matched_row, report_number, category_blocks)
+                            current_report_number += 1
+                            logger.debug("Added report %s for distributor code %s", report_number, code)
+                    reports[code] = report_number
+                    reporter.distributors_done += 1
+                    reporter.update(
+                        f"Distributor {code} (report {report_number})",
+                        reporter.file_fraction(done_in_file, len(grouped_dump)),
+                    )
 
-                        # Format the grand total row
-                        for col in ["D", "H", "J", "M", "N"]:
-                            ws.cell(
-                                row=grand_total_row,
-                                column=column_index_from_string(col),
-                            ).number_format = "#,##0"
-
-                        
-                        # Increment report number and update start row for next report
-                        current_report_number += 1
-                        new_start_row = grand_total_row + 3  # Space for next report
-                        # Save after each distributor
-                        wb.save(output_file)
-                        print(f"Successfully processed distributor code: {code}")
-                    else:
-                        print(
-                            f"Distributor code {code} not found in target file. Skipping..."
-                        )
+                manifest.record(excel_file, signatures[excel_file], reports)
 
-                if not found_any_match:
-                    print(f"No matching distributor codes found in file: {excel_file}")
+                if skipped:
+                    logger.info(f"Distributor codes of {excel_file} not in the plan file: {skipped}")
+                    print(f"{len(skipped)} distributor codes not found in the plan file. Skipping them.")
+                if reports:
+                    print(f"Processed {len(reports)} distributors ({regenerated} regenerated).")
                 else:
-                    print(f"Saved progress after processing file: {excel_file}")
+                    print(f"No matching distributor codes found in file: {excel_file}")
 
+            except RunCancelled:
+                raise
             except Exception as e:
                 logger.exception(f"Error processing file {excel_file}: {str(e)}\n{traceback.format_exc()}")
                 print(f"Error processing file {excel_file}: {str(e)}")
                 continue
 
+        # The summary of a ReportWriter is read back from the open workbook;
+        # a StreamingReportWriter collected it while rendering. A failed
+        # summary never costs the report.
+        if summary and isinstance(writer, ReportWriter):
+            summary_status["written"] = summarize_report(
+                writer.wb, writer.section_index, summary_upsert, reporter
+            )
+
+        # Single write of the whole run
+        reporter.files_done = len(pending_files)
+        reporter.update("Saving output workbook", 1.0, force=True)
+        with metrics.span("save"):
+            writer.save()
+        manifest.save()
+        if summary and isinstance(writer, StreamingReportWriter):
+            summary_status["written"] = writer.summary_error is None
+            if writer.summary_error is None:
+                print(f"Summary Report written with {len(writer.summary_records)} records.")
+            else:
+                print(f"Error building the Summary Report: {writer.summary_error}")
         print(
             f"\nAll files processed successfully. Output saved to: {output_file}"
         )
-
-
-        # apply_thick_border_to_sections(output_file)
-
+        return output_file
+
+    except RunCancelled:
+        if dumps is not None:
+            dumps.close()
+        if created_file and os.path.exists(created_file):
+            os.remove(created_file)
+        logger.info("Report generation cancelled")
+        print("Run cancelled. No output was saved.")
     except Exception as e:
         logger.exception(f"Exception in select_excel_files: {e}\n{traceback.format_exc()}")
         print(f"Error processing files: {str(e)}")
@@ -560,6 +1157,7 @@ def get_resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 
 if __name__ == "__main__":
+    configure_logging()
     try:
         select_excel_files()
     except Exception as e:
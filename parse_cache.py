@@ -0,0 +1,268 @@
+import datetime
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from run_manifest import file_hash
+
+# Bump when the layout of the cache files changes
+CACHE_VERSION = 2
+DEFAULT_MAX_MB = 512
+
+# Environment overrides of the defaults
+DIR_ENV = "HCCB_CACHE_DIR"
+MAX_MB_ENV = "HCCB_CACHE_MAX_MB"
+
+INDEX_FILE = "index.json"
+ENTRY_SUFFIX = ".npz"
+
+
+def default_cache_dir():
+    """$HCCB_CACHE_DIR, else a parse_cache folder in the user's local cache."""
+    if os.environ.get(DIR_ENV):
+        return os.path.abspath(os.environ[DIR_ENV])
+    base_path = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base_path, "hccb_report", "parse_cache")
+
+
+def _json_default(value):
+    """JSON form of the cell values json cannot write itself, tagged for _json_object()."""
+    if value is pd.NaT:
+        return {"nat": None}
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"date": value.isoformat()}
+    if isinstance(value, datetime.time):
+        return {"time": value.isoformat()}
+    if isinstance(value, datetime.timedelta):
+        return {"timedelta": value // datetime.timedelta(microseconds=1)}
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot store {type(value).__name__} values")
+
+
+def _json_object(obj):
+    if "nat" in obj:
+        return pd.NaT
+    if "datetime" in obj:
+        return datetime.datetime.fromisoformat(obj["datetime"])
+    if "date" in obj:
+        return datetime.date.fromisoformat(obj["date"])
+    if "time" in obj:
+        return datetime.time.fromisoformat(obj["time"])
+    if "timedelta" in obj:
+        return datetime.timedelta(microseconds=obj["timedelta"])
+    return obj
+
+
+def _encode_objects(values):
+    """Python objects as a JSON string array, so files load without pickle."""
+    return np.array(json.dumps(list(values), default=_json_default))
+
+
+def _decode_objects(array):
+    return json.loads(str(array), object_hook=_json_object)
+
+
+def save_frame(path, df, meta=None):
+    """
+    Write a DataFrame column by column to an .npz file.
+
+    Categorical columns are stored as codes and categories, the others as
+    one array each with their dtype name, so load_frame() returns an equal
+    frame. Object and string values are stored as JSON rather than pickled,
+    so a file planted in a shared folder cannot run code when loaded.
+    ``meta`` is a JSON-serializable dict read back by frame_meta(). The
+    file is written atomically; values JSON cannot hold raise TypeError.
+    """
+    arrays = {"columns": _encode_objects(df.columns)}
+    dtypes = []
+    for position, column in enumerate(df.columns):
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            arrays[f"codes{position}"] = series.cat.codes.to_numpy()
+            arrays[f"categories{position}"] = _encode_objects(categories)
+            dtypes.append(["category", str(categories.dtype)])
+        else:
+            values = series.to_numpy()
+            if values.dtype == object:
+                arrays[f"objects{position}"] = _encode_objects(values)
+            else:
+                arrays[f"values{position}"] = values
+            dtypes.append([str(series.dtype), None])
+    arrays["dtypes"] = np.array(json.dumps(dtypes))
+    arrays["meta"] = np.array(json.dumps(meta or {}))
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(temp_path, path)
+
+
+def load_frame(path):
+    """Read a DataFrame written by save_frame()."""
+    # Never unpickle: snapshots live next to plan files, often in shared folders
+    with np.load(path, allow_pickle=False) as data:
+        columns = _decode_objects(data["columns"])
+        dtypes = json.loads(str(data["dtypes"]))
+        frame = {}
+        for position, (column, (dtype, categories_dtype)) in enumerate(zip(columns, dtypes)):
+            if dtype == "category":
+                categories = pd.Index(_decode_objects(data[f"categories{position}"]), dtype=categories_dtype)
+                frame[column] = pd.Categorical.from_codes(data[f"codes{position}"], categories)
+            elif f"objects{position}" in data.files:
+                frame[column] = pd.Series(_decode_objects(data[f"objects{position}"]), dtype=dtype)
+            else:
+                frame[column] = pd.Series(data[f"values{position}"], dtype=dtype)
+    return pd.DataFrame(frame, columns=columns)
+
+
+def frame_meta(path):
+    """The ``meta`` dict of a file written by save_frame(), without loading the columns."""
+    with np.load(path, allow_pickle=False) as data:
+        return json.loads(str(data["meta"])) if "meta" in data.files else {}
+
+
+class ParseCache:
+    """
+    Parsed dump files on disk, so re-runs on the same files skip parsing.
+
+    Entries are named by the file's content hash and a ``schema`` string
+    (the projected columns), so a touched, copied or renamed file still
+    hits while an edited one misses. An index of path -> size, mtime and
+    hash saves hashing files whose size and mtime are unchanged. Entries
+    are used in LRU order: a hit refreshes the entry's mtime and prune()
+    deletes the least recently used ones above ``max_bytes``.
+
+    Only the main process touches the index; workers read and write
+    entries through load_frame()/save_frame() on the paths from entry().
+    """
+
+    def __init__(self, folder=None, max_bytes=None, schema=""):
+        self.folder = folder or default_cache_dir()
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get(MAX_MB_ENV) or DEFAULT_MAX_MB) * 2**20)
+        self.max_bytes = max_bytes
+        self.schema = schema
+        self._index = None
+
+    @property
+    def index_path(self):
+        return os.path.join(self.folder, INDEX_FILE)
+
+    def _load_index(self):
+        if self._index is None:
+            try:
+                with open(self.index_path, encoding="utf-8") as f:
+                    data = json.load(f)
+                self._index = data["files"] if data.get("version") == CACHE_VERSION else {}
+            except (OSError, ValueError, KeyError):
+                # A missing or unreadable index only costs hashing
+                self._index = {}
+        return self._index
+
+    def entry(self, excel_file):
+        """Cache file for the current content of ``excel_file`` (it may not exist yet)."""
+        index = self._load_index()
+        key = os.path.abspath(excel_file)
+        stat = os.stat(excel_file)
+        known = index.get(key)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            content_hash = known["hash"]
+        else:
+            content_hash = file_hash(excel_file)
+            index[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": content_hash}
+        schema_hash = hashlib.blake2b(f"{CACHE_VERSION}:{self.schema}".encode("utf-8"), digest_size=6).hexdigest()
+        return os.path.join(self.folder, f"{content_hash}-{schema_hash}{ENTRY_SUFFIX}")
+
+    def save(self):
+        """Write the index and prune the cache to its size cap."""
+        os.makedirs(self.folder, exist_ok=True)
+        index = self._load_index()
+        # Forget files that no longer exist
+        for key in [key for key in index if not os.path.exists(key)]:
+            del index[key]
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "files": index}, f, indent=1)
+        os.replace(temp_path, self.index_path)
+        self.prune()
+
+    def entries(self):
+        """(path, size, last used) of every cache file, least recently used first."""
+        found = []
+        try:
+            names = os.listdir(self.folder)
+        except FileNotFoundError:
+            return found
+        for name in names:
+            if name.endswith(ENTRY_SUFFIX):
+                path = os.path.join(self.folder, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                found.append((path, stat.st_size, stat.st_mtime))
+        return sorted(found, key=lambda entry: entry[2])
+
+    def prune(self):
+        """Delete least recently used entries until the cache fits ``max_bytes``; returns their count."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self):
+        """Delete every cache file and the index; returns (files, bytes) removed."""
+        entries = self.entries()
+        for path, _, _ in entries:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        try:
+            os.remove(self.index_path)
+        except FileNotFoundError:
+            pass
+        self._index = {}
+        return len(entries), sum(size for _, size, _ in entries)
+
+
+def read_cached(cache_file, read):
+    """
+    DataFrame of a cache entry, or ``read()`` stored as that entry on a miss.
+
+    Returns (DataFrame, hit). A hit refreshes the entry's LRU time; an
+    unreadable entry is treated as a miss and overwritten.
+    """
+    if os.path.exists(cache_file):
+        try:
+            df = load_frame(cache_file)
+            now = time.time()
+            os.utime(cache_file, (now, now))
+            return df, True
+        except Exception:
+            pass
+    df = read()
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        save_frame(cache_file, df)
+    except (OSError, TypeError):
+        # A read-only or full cache folder, or unstorable values, must not fail the run
+        pass
+    return df, False
@@ -0,0 +1,83 @@
+import os
+import threading
+
+from parse_cache import frame_meta, load_frame, save_frame
+from run_manifest import file_hash
+
+# Bump when the layout of the snapshot changes
+SNAPSHOT_VERSION = 2
+
+# Plan file path -> (size, mtime_ns, schema, DataFrame) of this session
+_loaded = {}
+_lock = threading.Lock()
+
+
+def snapshot_path(plan_file):
+    """Snapshot file next to a plan workbook: plan.xlsx -> plan.snapshot.npz"""
+    return os.path.splitext(plan_file)[0] + ".snapshot.npz"
+
+
+def load_plan_snapshot(plan_file, read, schema=""):
+    """
+    The prepared plan DataFrame of ``plan_file``, read at most once per change.
+
+    ``read()`` parses the plan file into the DataFrame to keep. Its result
+    is kept in memory for the session and saved as a snapshot next to the
+    plan file, together with the file's size, mtime and content hash and
+    ``schema`` (what ``read`` projects). A later call, in this or a later
+    session, returns the kept copy while the plan file is unchanged; an
+    edited plan file, or a different ``schema``, reads it again.
+
+    Returns (DataFrame, source) with source "memory", "snapshot" or "read".
+    """
+    key = os.path.abspath(plan_file)
+    stat = os.stat(plan_file)
+    with _lock:
+        loaded = _loaded.get(key)
+    if loaded and loaded[:3] == (stat.st_size, stat.st_mtime_ns, schema):
+        return loaded[3], "memory"
+
+    path = snapshot_path(plan_file)
+    df, source = _load_snapshot(path, plan_file, stat, schema), "snapshot"
+    if df is None:
+        df, source = read(), "read"
+        meta = {
+            "version": SNAPSHOT_VERSION,
+            "schema": schema,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": file_hash(plan_file),
+        }
+        try:
+            save_frame(path, df, meta)
+        except (OSError, TypeError):
+            # A read-only plan folder or unstorable values only cost reading the plan again
+            pass
+
+    with _lock:
+        _loaded[key] = (stat.st_size, stat.st_mtime_ns, schema, df)
+    return df, source
+
+
+def _load_snapshot(path, plan_file, stat, schema):
+    """DataFrame of a snapshot that still matches the plan file, else None."""
+    try:
+        meta = frame_meta(path)
+        if meta.get("version") != SNAPSHOT_VERSION or meta.get("schema") != schema:
+            return None
+        touched = (meta["size"], meta["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns)
+        if touched:
+            # Copied or touched but not edited files keep their snapshot
+            if meta["size"] != stat.st_size or meta["hash"] != file_hash(plan_file):
+                return None
+        df = load_frame(path)
+    except Exception:
+        # Missing or unreadable snapshots are rebuilt
+        return None
+    if touched:
+        # Record the new mtime, so later runs do not hash the plan file again
+        try:
+            save_frame(path, df, dict(meta, mtime_ns=stat.st_mtime_ns))
+        except (OSError, TypeError):
+            pass
+    return df
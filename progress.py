@@ -0,0 +1,76 @@
+import threading
+import time
+
+
+class RunCancelled(Exception):
+    """Raised inside a run when its CancelToken was cancelled."""
+
+
+class CancelToken:
+    """Thread-safe cancellation flag, set by the caller and checked by a run."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise RunCancelled()
+
+
+class ProgressReporter:
+    """
+    Throttled progress events and cancellation checks for one run.
+
+    ``callback`` receives dicts with the keys "stage", "message",
+    "fraction" (0..1, or None when the run cannot estimate it),
+    "files_done", "files_total" and "distributors_done". Events closer than
+    ``interval`` seconds to the previous one are dropped unless forced, so
+    a fast loop cannot flood the receiver. Both ``callback`` and ``cancel``
+    are optional.
+    """
+
+    def __init__(self, callback=None, cancel=None, stage="report", interval=0.2):
+        self.callback = callback
+        self.cancel = cancel
+        self.stage = stage
+        self.interval = interval
+        self.files_done = 0
+        self.files_total = 0
+        self.distributors_done = 0
+        self._last_sent = 0.0
+
+    def check(self):
+        """Raise RunCancelled if the run was cancelled."""
+        if self.cancel is not None:
+            self.cancel.raise_if_cancelled()
+
+    def update(self, message=None, fraction=None, force=False):
+        self.check()
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_sent < self.interval:
+            return
+        self._last_sent = now
+        self.callback({
+            "stage": self.stage,
+            "message": message,
+            "fraction": fraction,
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "distributors_done": self.distributors_done,
+        })
+
+    def file_fraction(self, done_in_file=0, total_in_file=0):
+        """Share of the run done, counting the current file by its distributors."""
+        if not self.files_total:
+            return None
+        current = done_in_file / total_in_file if total_in_file else 0.0
+        return min(1.0, (self.files_done + current) / self.files_total)
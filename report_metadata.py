@@ -0,0 +1,65 @@
+from openpyxl.packaging.custom import IntProperty
+
+# Custom document properties of a report workbook describing its tail
+LAST_REPORT_NUMBER = "Last Report Number"
+LAST_ROW = "Last Report Row"
+
+
+def report_sheet(wb, stamp):
+    """
+    The sheet holding the report sections: the one named like the template
+    sheet, or the active sheet for workbooks that do not have it. The
+    summary tool moves its own sheet first, so the active sheet alone is
+    not reliable.
+    """
+    if stamp.title in wb.sheetnames:
+        return wb[stamp.title]
+    return wb.active
+
+
+def read_report_metadata(wb):
+    """Return (last report number, last row) stored in a workbook, or None."""
+    props = wb.custom_doc_props
+    if LAST_REPORT_NUMBER not in props.names or LAST_ROW not in props.names:
+        return None
+    try:
+        return int(props[LAST_REPORT_NUMBER].value), int(props[LAST_ROW].value)
+    except (TypeError, ValueError):
+        return None
+
+
+def write_report_metadata(wb, last_report_number, last_row):
+    """Store the last report number and last used row (normal or write-only workbook)."""
+    props = wb.custom_doc_props
+    for name in (LAST_REPORT_NUMBER, LAST_ROW):
+        if name in props.names:
+            del props[name]
+    props.append(IntProperty(name=LAST_REPORT_NUMBER, value=int(last_report_number)))
+    props.append(IntProperty(name=LAST_ROW, value=int(last_row)))
+
+
+def scan_report_tail(ws):
+    """
+    Find (last report number, last row) of a report sheet without metadata.
+
+    Only columns B to D are read, values only: the "Report Number" label
+    sits in column B and its value in column D.
+    """
+    last_report_number = 0
+    for label, _, value in ws.iter_rows(min_col=2, max_col=4, values_only=True):
+        if label is not None and str(label).strip() == "Report Number":
+            if isinstance(value, (int, float)):
+                last_report_number = max(last_report_number, int(value))
+    return last_report_number, ws.max_row
+
+
+def report_tail(ws):
+    """
+    (last report number, last row) of a report sheet: from the workbook
+    metadata when it matches the sheet, otherwise from scan_report_tail.
+    """
+    metadata = read_report_metadata(ws.parent)
+    # Rows added after the last run (e.g. by hand) make the metadata stale
+    if metadata is not None and metadata[1] == ws.max_row:
+        return metadata
+    return scan_report_tail(ws)
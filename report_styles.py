@@ -0,0 +1,69 @@
+import weakref
+from copy import copy
+
+from openpyxl.cell.cell import Cell
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+# Building blocks, created once for the whole process
+BLACK = "000000"
+THIN_SIDE = Side(style="thin", color=BLACK)
+THIN_BORDER = Border(left=THIN_SIDE, right=THIN_SIDE, top=THIN_SIDE, bottom=THIN_SIDE)
+CENTER = Alignment(horizontal="center")
+HEADER_VALUE_ALIGNMENT = Alignment(vertical="center", horizontal="left")
+BOLD = Font(bold=True)
+DARK_FILL = PatternFill("solid", fgColor="222B35")
+SUMMARY_INPUT_FILL = PatternFill(start_color="D6DCE4", end_color="D6DCE4", fill_type="solid")
+THOUSANDS = "#,##0"
+
+# Named styles: style name -> cell attributes it sets. Attributes that are
+# not listed keep the workbook default, as when they are never assigned.
+STYLES = {
+    # Item rows and Grand Total row of a report section (columns B to O)
+    "report_cell": dict(border=THIN_BORDER, alignment=CENTER, font=BOLD),
+    "report_number": dict(border=THIN_BORDER, alignment=CENTER, font=BOLD, number_format=THOUSANDS),
+    "report_divider": dict(border=THIN_BORDER, alignment=CENTER, font=BOLD, fill=DARK_FILL),
+    # Rows of the Summary Report sheet
+    "summary_cell": dict(border=THIN_BORDER),
+    "summary_input": dict(border=THIN_BORDER, fill=SUMMARY_INPUT_FILL),
+}
+
+
+class StyleRegistry:
+    """
+    STYLES registered once in a workbook and applied by reference.
+
+    Applying a style assigns a precomputed style array to the cell instead
+    of creating and hashing new Border/Font/Fill objects for every cell.
+    """
+
+    def __init__(self, ws):
+        self._arrays = {}
+        for name, attributes in STYLES.items():
+            probe = Cell(ws)
+            for attribute, value in attributes.items():
+                setattr(probe, attribute, value)
+            self._arrays[name] = probe._style
+
+    def apply(self, cell, name):
+        cell._style = copy(self._arrays[name])
+        return cell
+
+    def apply_range(self, ws, name, min_row, max_row, min_col, max_col):
+        """Apply a style to every cell of a rectangular range, creating the cells."""
+        style = self._arrays[name]
+        for row in range(min_row, max_row + 1):
+            for column in range(min_col, max_col + 1):
+                ws.cell(row=row, column=column)._style = copy(style)
+
+
+# workbook -> StyleRegistry
+_registries = weakref.WeakKeyDictionary()
+
+
+def get_style_registry(ws):
+    """Return the StyleRegistry of the workbook that ``ws`` belongs to."""
+    wb = ws.parent
+    registry = _registries.get(wb)
+    if registry is None:
+        registry = _registries[wb] = StyleRegistry(ws)
+    return registry
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+
+# Bump when the layout of the manifest file changes
+MANIFEST_VERSION = 1
+
+
+def manifest_path(output_file):
+    """Sidecar file next to an output workbook: report.xlsx -> report.manifest.json"""
+    return os.path.splitext(output_file)[0] + ".manifest.json"
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Content hash of a file, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """
+    Dump files already rendered into an output workbook.
+
+    Every entry records the file's size, mtime and content hash, and the
+    report number assigned to each distributor code it produced. Files
+    whose size and mtime are unchanged are not even hashed, so checking a
+    large folder costs one stat() per file.
+    """
+
+    def __init__(self, path, files=None):
+        self.path = path
+        # absolute dump file path -> {"size", "mtime_ns", "hash", "reports"}
+        self.files = files if files is not None else {}
+
+    @classmethod
+    def load(cls, output_file):
+        """Read the manifest of an output workbook; empty when it has none."""
+        path = manifest_path(output_file)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls(path)
+        except (OSError, ValueError):
+            # An unreadable manifest only costs a full run
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("files", {}))
+
+    def check(self, excel_file):
+        """
+        Compare a dump file with its entry.
+
+        Returns (status, signature): status is "new", "changed" or
+        "unchanged", and signature is the file's current size, mtime and
+        hash to pass to record().
+        """
+        key = os.path.abspath(excel_file)
+        stat = os.stat(excel_file)
+        entry = self.files.get(key)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return "unchanged", {"size": entry["size"], "mtime_ns": entry["mtime_ns"], "hash": entry["hash"]}
+
+        signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": file_hash(excel_file)}
+        if entry is None:
+            return "new", signature
+        if entry["hash"] == signature["hash"]:
+            # Touched but not modified
+            entry.update(signature)
+            return "unchanged", signature
+        return "changed", signature
+
+    def reports(self, excel_file):
+        """Distributor code -> report number rendered from a dump file."""
+        entry = self.files.get(os.path.abspath(excel_file))
+        return dict(entry["reports"]) if entry else {}
+
+    def record(self, excel_file, signature, reports):
+        """Record a dump file as rendered, with its code -> report number map."""
+        self.files[os.path.abspath(excel_file)] = dict(signature, reports=dict(reports))
+
+    def save(self):
+        """Write the manifest atomically, so an interrupted save keeps the old one."""
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "files": self.files}, f, indent=1)
+        os.replace(temp_path, self.path)
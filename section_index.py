@@ -0,0 +1,87 @@
+import hashlib
+import numbers
+from datetime import date, datetime
+
+# Hidden sheet of a report workbook listing every report section
+SECTION_INDEX_SHEET = "Section Index"
+INDEX_HEADER = ("Report Number", "Start Row", "End Row", "Fingerprint", "Summarized Fingerprint")
+
+# A report section runs from this marker in column B to its Grand Total row
+SECTION_MARKER = "Distributor Audit Report"
+
+# Columns A to O hold a report section
+SECTION_MAX_COL = 15
+
+
+def _normalize(value):
+    # Saved floats can come back as ints (112.0 -> 112) and numpy scalars as
+    # plain ints, so all numbers are compared as floats
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, numbers.Real):
+        return repr(float(value))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def section_fingerprint(rows):
+    """Content fingerprint of a section from its values-only row tuples."""
+    digest = hashlib.blake2b(digest_size=16)
+    for row in rows:
+        values = [_normalize(v) for v in row]
+        while values and values[-1] == "":
+            values.pop()
+        digest.update("\x1f".join(values).encode("utf-8"))
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+def sheet_section_fingerprint(ws, start_row, end_row):
+    """Fingerprint rows ``start_row``..``end_row`` (columns A to O) of a worksheet."""
+    return section_fingerprint(ws.iter_rows(
+        min_row=start_row, max_row=end_row,
+        min_col=1, max_col=SECTION_MAX_COL, values_only=True,
+    ))
+
+
+def read_section_index(wb):
+    """
+    Return the section index of a workbook as a dict of report number (str)
+    -> {"start", "end", "fingerprint", "summarized"}, or None when the
+    workbook has no index.
+    """
+    if SECTION_INDEX_SHEET not in wb.sheetnames:
+        return None
+    index = {}
+    rows = wb[SECTION_INDEX_SHEET].iter_rows(min_row=2, values_only=True)
+    for row in rows:
+        if not row or row[0] is None:
+            continue
+        row = tuple(row) + (None,) * (len(INDEX_HEADER) - len(row))
+        index[str(row[0])] = {
+            "start": int(row[1]),
+            "end": int(row[2]),
+            "fingerprint": row[3],
+            "summarized": row[4],
+        }
+    return index
+
+
+def _index_rows(index):
+    yield INDEX_HEADER
+    for number, entry in sorted(index.items(), key=lambda item: item[1]["start"]):
+        yield (number, entry["start"], entry["end"], entry["fingerprint"], entry.get("summarized"))
+
+
+def write_section_index(wb, index):
+    """Replace the hidden section index sheet of a workbook (normal or write-only)."""
+    if not getattr(wb, "write_only", False) and SECTION_INDEX_SHEET in wb.sheetnames:
+        wb.remove(wb[SECTION_INDEX_SHEET])
+    ws = wb.create_sheet(SECTION_INDEX_SHEET)
+    for row in _index_rows(index):
+        ws.append(row)
+    ws.sheet_state = "hidden"
+    return ws
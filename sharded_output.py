@@ -0,0 +1,200 @@
+import os
+import re
+import shutil
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from openpyxl import load_workbook
+
+from copy_template import load_template_stamp
+from modified_excel import (
+    ReportWriter,
+    StreamingReportWriter,
+    dump_parse_cache,
+    get_excel_files_from_folder,
+    get_resource_path,
+    iter_dump_files,
+    join_distributor_reports,
+    load_plan_index,
+    logger,
+)
+from summary_report_tool import build_consolidated_summary
+
+# --shard-by values that split by a plan column
+SHARD_COLUMNS = {"zone": "Zone", "unit": "Unit"}
+
+
+def collect_distributor_reports(excel_files, plan_index, workers=1, cache=None):
+    """
+    Parse and join every dump file, numbering the reports globally.
+
+    Returns a list of (report number, code, plan row, category blocks) in
+    the same order, and so with the same numbers, as a single-file run.
+    """
+    reports = []
+    for file_index, (excel_file, grouped_dump, error) in enumerate(iter_dump_files(excel_files, workers, cache)):
+        print(f"\nReading file {file_index + 1} of {len(excel_files)}: {excel_file}")
+        if error:
+            logger.error(f"Error processing file {excel_file}: {error}")
+            print(f"Error processing file {excel_file}: {error.splitlines()[0]}")
+            continue
+        skipped = []
+        for code, matched_row, category_blocks in join_distributor_reports(grouped_dump, plan_index):
+            if matched_row is None:
+                skipped.append(code)
+                continue
+            reports.append((len(reports) + 1, code, matched_row, category_blocks))
+        if skipped:
+            logger.info(f"Distributor codes of {excel_file} not in the plan file: {skipped}")
+            print(f"{len(skipped)} distributor codes not found in the plan file. Skipping them.")
+    return reports
+
+
+def shard_name(shard_by, position, matched_row):
+    """
+    Shard of the report at ``position`` (0-based, in numbering order): the
+    plan row's Zone or Unit, or the index of a fixed-size block of reports
+    when ``shard_by`` is a number.
+    """
+    if isinstance(shard_by, int):
+        return f"part{position // shard_by + 1:03d}"
+    value = matched_row.get(SHARD_COLUMNS[shard_by], "")
+    value = "" if value is None or value != value else str(value).strip()
+    return value or "unassigned"
+
+
+def split_into_shards(reports, shard_by):
+    """Group numbered reports into shards, keeping their order; shard -> reports."""
+    if isinstance(shard_by, str):
+        shard_by = shard_by.lower()
+        if shard_by.isdigit():
+            shard_by = int(shard_by)
+        elif shard_by not in SHARD_COLUMNS:
+            raise ValueError(f"shard_by must be one of {sorted(SHARD_COLUMNS)} or a shard size, not {shard_by!r}")
+    if isinstance(shard_by, int) and shard_by < 1:
+        raise ValueError("Shard size must be at least 1")
+
+    shards = {}
+    for position, report in enumerate(reports):
+        shards.setdefault(shard_name(shard_by, position, report[2]), []).append(report)
+    return shards
+
+
+def render_shard(output_file, template_path, reports, streaming=False):
+    """Write the reports of one shard to ``output_file``; returns the file path."""
+    stamp = load_template_stamp(template_path)
+    if streaming:
+        writer = StreamingReportWriter(output_file, stamp)
+    else:
+        shutil.copy2(template_path, output_file)
+        writer = ReportWriter(
+            output_file, load_workbook(output_file), stamp,
+            template_in_place=True, section_index={},
+        )
+    for report_number, _, matched_row, category_blocks in reports:
+        writer.add_section(matched_row, report_number, category_blocks)
+    writer.save()
+    return output_file
+
+
+def _render_shard_isolated(job):
+    """Worker entry point: never raises, so one failing shard cannot stop the others."""
+    output_file, template_path, reports, streaming = job
+    try:
+        return render_shard(output_file, template_path, reports, streaming), None
+    except Exception as e:
+        return output_file, f"{e}\n{traceback.format_exc()}"
+
+
+def _file_part(name):
+    return re.sub(r"[^\w.-]+", "_", name).strip("._") or "shard"
+
+
+def unique_file_parts(names):
+    """
+    File name parts of shard names, numbered _2, _3, ... where two names
+    would map to the same file. Compared case-insensitively, as Windows
+    file names are.
+    """
+    parts, used = [], set()
+    for name in names:
+        part = base = _file_part(name)
+        count = 1
+        while part.lower() in used:
+            count += 1
+            part = f"{base}_{count}"
+        used.add(part.lower())
+        parts.append(part)
+    return parts
+
+
+def generate_sharded_reports(dump_folder, plan_file, shard_by="zone", output_dir=".",
+                             workers=1, streaming=False, summary=False, use_cache=True):
+    """
+    Render the reports of a run into one workbook per shard instead of one
+    ever-growing sheet.
+
+    ``shard_by`` is "zone" or "unit" (plan file columns) or a number of
+    reports per shard. Reports are numbered globally, exactly as in
+    select_excel_files, and every shard is rendered in its own worker
+    process (up to ``workers`` at a time). With ``summary=True`` a
+    consolidated Summary Report across all shards is written as well.
+    ``use_cache`` works as in select_excel_files.
+
+    Returns (list of shard files, summary file or None), or None when
+    nothing was generated.
+    """
+    try:
+        folders = [dump_folder] if isinstance(dump_folder, (str, os.PathLike)) else list(dump_folder)
+        excel_files = [f for folder in folders for f in get_excel_files_from_folder(folder)]
+        if not excel_files:
+            print("No Excel files found in the selected folder. Exiting...")
+            return
+
+        plan_index = load_plan_index(plan_file)
+        cache = dump_parse_cache() if use_cache else None
+        reports = collect_distributor_reports(excel_files, plan_index, workers, cache)
+        if not reports:
+            print("No matching distributor codes found. Exiting...")
+            return
+        shards = split_into_shards(reports, shard_by)
+
+        os.makedirs(output_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        template_path = get_resource_path("report_template.xlsx")
+        jobs = [
+            (os.path.join(output_dir, f"template_copy_{timestamp}_{part}.xlsx"),
+             template_path, shard_reports, streaming)
+            for part, shard_reports in zip(unique_file_parts(shards), shards.values())
+        ]
+        print(f"\nWriting {len(reports)} reports into {len(jobs)} shards")
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(jobs))
+        if workers <= 1:
+            results = [_render_shard_isolated(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_render_shard_isolated, jobs))
+
+        shard_files = []
+        for (output_file, error), job in zip(results, jobs):
+            if error:
+                logger.error(f"Error writing shard {output_file}: {error}")
+                print(f"Error writing shard {output_file}: {error.splitlines()[0]}")
+                continue
+            shard_files.append(output_file)
+            print(f"Shard saved: {output_file} ({len(job[2])} reports)")
+
+        summary_file = None
+        if summary and shard_files:
+            summary_file = build_consolidated_summary(
+                shard_files, os.path.join(output_dir, f"summary_{timestamp}.xlsx")
+            )
+        return shard_files, summary_file
+
+    except Exception as e:
+        logger.exception(f"Exception in generate_sharded_reports: {e}\n{traceback.format_exc()}")
+        print(f"Error processing files: {str(e)}")
@@ -1,24 +1,24 @@
-import openpyxl
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
-from openpyxl.utils import get_column_letter
-from tkinter import Tk, filedialog
+from openpyxl import Workbook, load_workbook
 import os
 import sys
 import logging
 import traceback
 
-from copy_template import create_sheet_with_template_if_not_exists
+import metrics
+from app_logging import configure_logging
+from copy_template import add_sheet_with_template_if_not_exists
+from progress import ProgressReporter, RunCancelled
+from report_styles import get_style_registry
+from section_index import (
+    SECTION_MARKER,
+    SECTION_MAX_COL,
+    read_section_index,
+    sheet_section_fingerprint,
+    write_section_index,
+)
 
-# Logger setup
+# Handlers are set up once by the entry point (app_logging.configure_logging)
 logger = logging.getLogger("AppLogger")
-logger.setLevel(logging.INFO)
-file_handler = logging.FileHandler("app.log", encoding="utf-8")
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(formatter)
-if not logger.hasHandlers():
-    logger.addHandler(file_handler)
 
 # Get the correct path for template file when running as executable
 def resource_path(relative_path):
@@ -37,6 +37,9 @@ def resource_path(relative_path):
 
 def select_file():
     """Open a file dialog and return the selected file path."""
+    # Imported here so headless runs (see cli.py) never load tkinter
+    from tkinter import Tk, filedialog
+
     root = Tk()
     root.withdraw()  # Hide the main tkinter window
     file_path = filedialog.askopenfilename(
@@ -46,183 +49,467 @@ def select_file():
     return file_path
 
 
-def extract_distributor_data(file_path):
+# Column B label of a report header -> summary field filled from column D
+HEADER_FIELDS = {
+    "Report Number": "Report Number",
+    "Zone": "Zone",
+    "Unit": "Unit",
+    "Customer Code of the Distributor": "Customer Code",
+    "Name of the Distributor": "Distributor Name",
+}
+
+
+def _new_distributor_record():
+    return {
+        'Report Number': '',
+        'Zone': '',
+        'Unit': '',
+        'Customer Code': '',
+        'Distributor Name': '',
+        'Date of Audit': '',
+        'Book Stock': 0,
+        'Good Stock': 0,
+        'Damaged Stock': 0,
+        'Physical Stock': 0,
+        'Difference': 0,
+        'Products_Over_75': 0,
+        'Observations': {},  # unique observations in order of appearance
+    }
+
+
+def _column(row, column):
+    """Value of a 1-based column in a values-only row tuple."""
+    return row[column - 1] if column <= len(row) else None
+
+
+def iter_distributor_records(rows, first_row=1):
+    """
+    Parse report sections from Sheet1 rows in a single pass.
+
+    ``rows`` is any iterable of values-only row tuples, the first of which
+    is sheet row ``first_row``. The parser moves from "Distributor Audit
+    Report" through the header labels to "Product Type", counts item rows
+    and collects observations until "Grand Total", and yields each
+    distributor record as soon as its Grand Total row is read. Records also
+    carry the 'Start Row' and 'End Row' of their section.
+    """
+    record = None
+    in_items = False
+
+    for row_number, row in enumerate(rows, first_row):
+        label = _column(row, 2)
+
+        if label == SECTION_MARKER:
+            record = _new_distributor_record()
+            record['Start Row'] = row_number
+            in_items = False
+            continue
+        if record is None:
+            continue
+
+        if not in_items:
+            if label in HEADER_FIELDS:
+                value = _column(row, 4)
+                record[HEADER_FIELDS[label]] = str(value) if label == "Report Number" else value
+            if _column(row, 8) == "Date of audit":
+                record['Date of Audit'] = _column(row, 12)
+            if label != "Product Type":
+                continue
+            in_items = True
+
+        if label == "Grand Total":
+            record['Book Stock'] = _column(row, 4) or 0
+            record['Good Stock'] = _column(row, 10) or 0
+            record['Damaged Stock'] = _column(row, 11) or 0
+            record['Physical Stock'] = _column(row, 12) or 0
+            record['End Row'] = row_number
+            yield record
+            record = None
+            continue
+
+        difference = _column(row, 14)
+        if difference:
+            try:
+                if abs(float(difference)) > 75:
+                    record['Products_Over_75'] += 1
+            except (ValueError, TypeError):
+                pass
+
+        # Column O (15) contains Observations/Comments
+        observation = _column(row, 15)
+        if observation and str(observation).strip():
+            record['Observations'][str(observation).strip()] = None
+
+
+def parse_changed_sections(sheet1, section_index=None, summary_rows=None):
+    """
+    Parse the sections of Sheet1 that still need summarizing.
+
+    With a section index only sections whose fingerprint differs from the
+    one last summarized, or whose report number is missing from
+    ``summary_rows`` (see summary_row_index), are read, each through its
+    own row range. Without one, Sheet1 is parsed in full and a new index
+    is built from it. Nothing is marked summarized here; the caller does
+    that with mark_summarized() for the records it actually writes.
+
+    Returns (records, section index).
+    """
+    if section_index is None:
+        records = list(iter_distributor_records(sheet1.iter_rows(values_only=True)))
+        section_index = {}
+        for record in records:
+            section_index[record['Report Number']] = {
+                "start": record['Start Row'],
+                "end": record['End Row'],
+                "fingerprint": sheet_section_fingerprint(sheet1, record['Start Row'], record['End Row']),
+            }
+        return records, section_index
+
+    records = []
+    pending = sorted(
+        (entry for number, entry in section_index.items() if section_pending(number, entry, summary_rows)),
+        key=lambda entry: entry["start"],
+    )
+    for entry in pending:
+        # An explicit max_col avoids recomputing the sheet width on every call
+        rows = sheet1.iter_rows(
+            min_row=entry["start"], max_row=entry["end"], max_col=SECTION_MAX_COL, values_only=True
+        )
+        records.extend(iter_distributor_records(rows, first_row=entry["start"]))
+    return records, section_index
+
+
+def section_pending(number, entry, summary_rows=None):
+    """
+    Whether an indexed section still needs summarizing: its fingerprint
+    differs from the one last summarized, or its report is missing from
+    ``summary_rows``. Fingerprints are recorded when a section is written,
+    so sections edited by hand in Excel are not noticed; summarize those
+    with ``full_rescan``.
+    """
+    return entry.get("summarized") != entry["fingerprint"] or (
+        summary_rows is not None and number not in summary_rows
+    )
+
+
+def count_pending_sections(file_path):
+    """
+    Sections a summary run on ``file_path`` would read, from a read-only
+    pass over the section index and the Summary Report's report numbers,
+    without loading the report sheet. None when the workbook has no
+    section index or no Summary Report sheet.
+    """
+    wb = load_workbook(file_path, read_only=True)
+    try:
+        for ws in wb.worksheets:
+            # Read the real extent even where a stale <dimension> was saved
+            ws.reset_dimensions()
+        section_index = read_section_index(wb)
+        if not section_index or "Summary Report" not in wb.sheetnames:
+            return None
+        summary_rows = summary_row_index(wb["Summary Report"])
+        return sum(
+            1 for number, entry in section_index.items() if section_pending(number, entry, summary_rows)
+        )
+    finally:
+        wb.close()
+
+
+def mark_summarized(section_index, records):
+    """Mark the sections of records written to the Summary Report as summarized."""
+    for record in records:
+        entry = section_index.get(record['Report Number'])
+        if entry is not None:
+            entry["summarized"] = entry["fingerprint"]
+
+
+def read_distributor_records(file_path, sheet_name="Sheet1"):
+    """Stream the distributor records of a report workbook from a read-only, values-only pass."""
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from iter_distributor_records(wb[sheet_name].iter_rows(values_only=True))
+    finally:
+        wb.close()
+
+
+def summary_row_index(summary_sheet):
+    """Map report number (str) -> row of the Summary Report sheet, in one read of column A."""
+    rows = {}
+    for row, (report_num,) in enumerate(
+        summary_sheet.iter_rows(min_row=2, max_col=1, values_only=True), 2
+    ):
+        if report_num:
+            rows[str(report_num)] = row
+    return rows
+
+
+def write_summary_row(summary_sheet, styles, row, data, keep_manual=False):
+    """
+    Write one distributor record to a Summary Report row.
+
+    New rows get the summary styles and blank manual columns. With
+    ``keep_manual`` the row already exists: styles and the manual columns
+    M, P, Q and R are left as they are, and O is recomputed from the kept M.
+    """
+    if not keep_manual:
+        styles.apply_range(summary_sheet, "summary_cell", row, row, 1, 18)
+        styles.apply_range(summary_sheet, "summary_input", row, row, 13, 14)
+    summary_sheet.cell(row=row, column=1).value = data['Report Number']
+    summary_sheet.cell(row=row, column=2).value = data['Zone']
+    summary_sheet.cell(row=row, column=3).value = data['Unit']
+    summary_sheet.cell(row=row, column=4).value = data['Customer Code']
+    summary_sheet.cell(row=row, column=5).value = data['Distributor Name']
+    summary_sheet.cell(row=row, column=6).value = data['Date of Audit']
+    summary_sheet.cell(row=row, column=7).value = data['Book Stock']
+    summary_sheet.cell(row=row, column=8).value = data['Good Stock']
+    summary_sheet.cell(row=row, column=9).value = data['Damaged Stock']
+
+    # Apply formulas: H + I = J (Good Stock + Damaged Stock = Physical Stock)
+    good_stock = data['Good Stock'] or 0
+    damaged_stock = data['Damaged Stock'] or 0
+    physical_stock = good_stock + damaged_stock
+    summary_sheet.cell(row=row, column=10).value = physical_stock
+
+    # Apply formulas: G - J = K (Book Stock - Physical Stock = Difference)
+    book_stock = data['Book Stock'] or 0
+    difference = book_stock - physical_stock
+    summary_sheet.cell(row=row, column=11).value = difference
+
+    summary_sheet.cell(row=row, column=12).value = data['Products_Over_75']
+
+    # Apply formulas: K - M = O (Difference - Products_Over_75 = Unexplained differences)
+    # Column M (13) is blank on new rows and filled in by hand afterwards
+    column_m_value = summary_sheet.cell(row=row, column=13).value or 0
+    try:
+        summary_sheet.cell(row=row, column=15).value = difference - column_m_value
+    except TypeError:
+        summary_sheet.cell(row=row, column=15).value = difference
+
+    if not keep_manual:
+        summary_sheet.cell(row=row, column=16).value = ""
+        summary_sheet.cell(row=row, column=17).value = ""
+        summary_sheet.cell(row=row, column=18).value = ""
+
+    # Add observations to column N (14)
+    # Remove 'Observations/Comments' (case-insensitive, trimmed) from the set
+    filtered_observations = [obs for obs in data['Observations'] if obs.strip().lower() != 'observations/comments']
+    summary_sheet.cell(row=row, column=14).value = ', '.join(filtered_observations)
+
+
+def add_summary_sheet(wb):
+    """The Summary Report sheet of an open workbook, created from the template when missing."""
+    _, summary_sheet = add_sheet_with_template_if_not_exists(
+        wb,
+        template_file_path=resource_path("summary_report_template.xlsx"),
+        new_sheet_name="Summary Report"
+    )
+    return summary_sheet
+
+
+def write_summary_records(summary_sheet, records, upsert=False, reporter=None, summary_rows=None):
+    """
+    Append distributor records to the Summary Report sheet.
+
+    Reports already in the sheet are skipped unless ``upsert=True``, in
+    which case their rows are overwritten in place, keeping the manually
+    filled columns. ``summary_rows`` is the sheet's summary_row_index()
+    when the caller already read it; it is updated with the added rows.
+    Returns (added, updated).
+    """
+    reporter = reporter or ProgressReporter()
+    # Report number -> row of the Summary Report, read once
+    if summary_rows is None:
+        summary_rows = summary_row_index(summary_sheet)
+    distributor_data = [
+        record for record in records
+        if upsert or record['Report Number'] not in summary_rows
+    ]
+
+    # Append new reports to Summary Report; with upsert, overwrite existing ones in place
+    next_row = summary_sheet.max_row + 1
+    styles = get_style_registry(summary_sheet)
+    added = updated = 0
+
+    for done, data in enumerate(distributor_data, 1):
+        reporter.distributors_done = done
+        reporter.update("Writing summary rows", done / len(distributor_data))
+        row = summary_rows.get(data['Report Number'])
+        if row is None:
+            row = summary_rows[data['Report Number']] = next_row
+            next_row += 1
+            write_summary_row(summary_sheet, styles, row, data)
+            added += 1
+        else:
+            write_summary_row(summary_sheet, styles, row, data, keep_manual=True)
+            updated += 1
+    return added, updated
+
+
+def summarize_workbook(wb, section_index=None, full_rescan=False, upsert=False, reporter=None):
+    """
+    Summarize an open report workbook in memory: the sections of Sheet1
+    not yet summarized are parsed and written to the Summary Report sheet,
+    which is moved to the front. Nothing is loaded or saved.
+
+    ``section_index`` is the workbook's section index when the caller
+    already holds it (e.g. a ReportWriter, whose entries are then marked
+    summarized); by default it is read from the workbook. ``full_rescan``
+    and ``upsert`` work as in extract_distributor_data.
+
+    Returns (added, updated).
+    """
+    reporter = reporter or ProgressReporter(stage="summary")
+    created = "Summary Report" not in wb.sheetnames
+    summary_sheet = add_summary_sheet(wb)
+
+    reporter.update("Reading report sections", force=True)
+    with metrics.span("summary parse"):
+        if full_rescan:
+            section_index = None
+        elif section_index is None:
+            section_index = read_section_index(wb)
+        if created and section_index:
+            # A new Summary Report holds none of the sections marked summarized
+            for entry in section_index.values():
+                entry.pop("summarized", None)
+        # Report number -> row of the Summary Report, read once
+        summary_rows = summary_row_index(summary_sheet)
+        records, section_index = parse_changed_sections(wb['Sheet1'], section_index, summary_rows)
+
+    with metrics.span("summary write"):
+        # Only written rows are marked, so skipped changes stay pending for an upsert
+        written = [record for record in records if upsert or record['Report Number'] not in summary_rows]
+        added, updated = write_summary_records(summary_sheet, written, upsert, reporter, summary_rows)
+        mark_summarized(section_index, written)
+        write_section_index(wb, section_index)
+
+    # Move the Summary Report sheet to the first position (index 0)
+    summary_sheet_index = wb.sheetnames.index("Summary Report")
+    wb.move_sheet("Summary Report", offset=-summary_sheet_index)
+    return added, updated
+
+
+def extract_distributor_data(file_path, full_rescan=False, upsert=False, run_metrics=None,
+                             progress=None, cancel=None):
+    """
+    Add the distributors of Sheet1 that are not yet summarized to the
+    Summary Report sheet.
+
+    Only sections that the hidden section index marks as new or changed
+    are read, and when there are none the workbook is not loaded at all.
+    The index fingerprints sections as the report run writes them, so hand
+    edits in Excel go unnoticed: ``full_rescan=True`` ignores the index,
+    parses all of Sheet1 and rebuilds it.
+
+    Reports already in the summary are skipped unless ``upsert=True``, in
+    which case their rows are overwritten in place, keeping the manually
+    filled columns M, P, Q and R.
+
+    Load, parse, write and save are timed like the report stages (see
+    modified_excel.select_excel_files); pass ``run_metrics`` to read them.
+    ``progress`` and ``cancel`` work as there; a cancelled run leaves the
+    file untouched.
+
+    Returns ``file_path`` once the workbook is saved, or None on failure.
+    """
+    run_metrics = run_metrics if run_metrics is not None else metrics.RunMetrics("summary")
+    with run_metrics.activate():
+        result = _extract_distributor_data(
+            file_path, full_rescan, upsert, ProgressReporter(progress, cancel, stage="summary")
+        )
+    for line in run_metrics.summary_lines():
+        print(line)
+        logger.info(line)
+    if result:
+        try:
+            run_metrics.write_jsonl(metrics.metrics_path(file_path))
+        except OSError as e:
+            logger.warning(f"Could not write run metrics: {e}")
+    return result
+
+
+def _extract_distributor_data(file_path, full_rescan, upsert, reporter):
     try:
         if not os.path.exists(file_path):
             print("File not found.")
             return
 
-        # Load the workbook
-        wb = load_workbook(file_path)
+        # Skip the full load when no section needs summarizing
+        if not full_rescan:
+            with metrics.span("summary check"):
+                pending = count_pending_sections(file_path)
+            if pending == 0:
+                print("Summary Report is up to date; no report sections changed.")
+                return file_path
 
-        # Create or ensure Summary Report sheet exists
-        create_sheet_with_template_if_not_exists(
-            existing_file_path=file_path,
-            template_file_path=resource_path("summary_report_template.xlsx"),
-            new_sheet_name="Summary Report"
-        )
-        # 🧠 Reload the workbook to reflect any new sheet creation
-        wb = load_workbook(file_path)
-        sheet1 = wb['Sheet1']
-        summary_sheet = wb['Summary Report']
-
-        # Get existing report numbers in Summary Report
-        existing_report_numbers = set()
-        for row in summary_sheet.iter_rows(min_row=2, max_col=1):
-            report_num = row[0].value
-            if report_num:
-                existing_report_numbers.add(str(report_num))
-
-        current_row = 1
-        distributor_data = []
-
-        while current_row <= sheet1.max_row:
-            if sheet1.cell(row=current_row, column=2).value == "Distributor Audit Report":
-                distributor_info = {
-                    'Report Number': '',
-                    'Zone': '',
-                    'Unit': '',
-                    'Customer Code': '',
-                    'Distributor Name': '',
-                    'Date of Audit': '',
-                    'Book Stock': 0,
-                    'Good Stock': 0,
-                    'Damaged Stock': 0,
-                    'Physical Stock': 0,
-                    'Difference': 0,
-                    'Products_Over_75': 0,
-                    'Observations': set(),  # Using set to store unique observations
-                }
-
-                current_row += 1
-
-                while current_row <= sheet1.max_row:
-                    cell_value = sheet1.cell(row=current_row, column=2).value
-                
-
-                    if cell_value == "Report Number":
-                        distributor_info['Report Number'] = str(sheet1.cell(row=current_row, column=4).value)
-                    elif cell_value == "Zone":
-                        distributor_info['Zone'] = sheet1.cell(row=current_row, column=4).value
-                    elif cell_value == "Unit":
-                        distributor_info['Unit'] = sheet1.cell(row=current_row, column=4).value
-                    elif cell_value == "Customer Code of the Distributor":
-                        distributor_info['Customer Code'] = sheet1.cell(row=current_row, column=4).value
-                    elif cell_value == "Name of the Distributor":
-                        distributor_info['Distributor Name'] = sheet1.cell(row=current_row, column=4).value
-                    elif cell_value == "Date of audit":
-                        distributor_info['Date of Audit'] = sheet1.cell(row=current_row, column=11).value
-                    elif cell_value == "Product Type":
-                        break
-
-                    current_row += 1
-
-                while current_row <= sheet1.max_row:
-                    if sheet1.cell(row=current_row, column=2).value == "Grand Total":
-                        distributor_info['Book Stock'] = sheet1.cell(row=current_row, column=4).value or 0
-                        distributor_info['Good Stock'] = sheet1.cell(row=current_row, column=10).value or 0
-                        distributor_info['Damaged Stock'] = sheet1.cell(row=current_row, column=11).value or 0
-                        distributor_info['Physical Stock'] = sheet1.cell(row=current_row, column=12).value or 0
-                        break
-                    elif sheet1.cell(row=current_row, column=14).value:
-                        try:
-                            difference = abs(float(sheet1.cell(row=current_row, column=14).value))
-                            if difference > 75:
-                                distributor_info['Products_Over_75'] += 1
-                        except (ValueError, TypeError):
-                            pass
-                    
-                    # Extract observations from column "Observations/Comments"
-                    observation = sheet1.cell(row=current_row, column=15).value  # Column O (15) contains Observations/Comments
-                    if observation and str(observation).strip():
-                        distributor_info['Observations'].add(str(observation).strip())
-                    
-                    current_row += 1
-
-                if distributor_info['Report Number'] not in existing_report_numbers:
-                    distributor_data.append(distributor_info)
-
-            current_row += 1
-
-        # Append data to Summary Report
-        start_row = summary_sheet.max_row + 1
-        black = "000000"
-        medium_border = Border(
-            left=Side(style='thin', color=black),
-            right=Side(style='thin', color=black),
-            top=Side(style='thin', color=black),
-            bottom=Side(style='thin', color=black)
-        )
+        # Loading dominates and cannot be estimated, so it reports no fraction
+        reporter.update("Loading report workbook", force=True)
+        # Load the workbook once; the summary sheet is added in memory
+        with metrics.span("summary load"):
+            wb = load_workbook(file_path)
 
-        for data in distributor_data:
-            for col_idx in range(1, 19):
-                cell = summary_sheet.cell(row=start_row, column=col_idx)
-                cell.border = medium_border
-            summary_sheet.cell(row=start_row, column=1).value = data['Report Number']
-            summary_sheet.cell(row=start_row, column=2).value = data['Zone']
-            summary_sheet.cell(row=start_row, column=3).value = data['Unit']
-            summary_sheet.cell(row=start_row, column=4).value = data['Customer Code']
-            summary_sheet.cell(row=start_row, column=5).value = data['Distributor Name']
-            summary_sheet.cell(row=start_row, column=6).value = data['Date of Audit']
-            summary_sheet.cell(row=start_row, column=7).value = data['Book Stock']
-            summary_sheet.cell(row=start_row, column=8).value = data['Good Stock']
-            summary_sheet.cell(row=start_row, column=9).value = data['Damaged Stock']
-            summary_sheet.cell(row=start_row, column=10).value = data['Physical Stock']  # Add this line
-            
-            # Apply formulas: H + I = J (Good Stock + Damaged Stock = Physical Stock)
-            good_stock = data['Good Stock'] or 0
-            damaged_stock = data['Damaged Stock'] or 0
-            summary_sheet.cell(row=start_row, column=10).value = good_stock + damaged_stock
-            
-            # Apply formulas: G - J = K (Book Stock - Physical Stock = Difference)
-            book_stock = data['Book Stock'] or 0
-            physical_stock = good_stock + damaged_stock
-            summary_sheet.cell(row=start_row, column=11).value = book_stock - physical_stock
-            
-            summary_sheet.cell(row=start_row, column=12).value = data['Products_Over_75']
-            
-            # Apply formulas: K - M = O (Difference - Products_Over_75 = Unexplained differences)
-            difference = book_stock - physical_stock  # This is the value in column K (11)
-            
-            # Get the value from column M (13) - this is currently blank/empty
-            column_m_value = summary_sheet.cell(row=start_row, column=13).value or 0
-            
-            # Calculate O (15) = K (11) - M (13)
-            summary_sheet.cell(row=start_row, column=15).value = difference - column_m_value
-
-            fill_color=PatternFill(start_color="D6DCE4", end_color="D6DCE4", fill_type="solid")
-            summary_sheet.cell(row=start_row, column=13).fill = fill_color
-            summary_sheet.cell(row=start_row, column=14).fill = fill_color
-            summary_sheet.cell(row=start_row, column=16).value = ""
-            summary_sheet.cell(row=start_row, column=17).value = ""
-            summary_sheet.cell(row=start_row, column=18).value = ""
-            
-            # Add observations to column N (14)
-            # Remove 'Observations/Comments' (case-insensitive, trimmed) from the set
-            filtered_observations = [obs for obs in data['Observations'] if obs.strip().lower() != 'observations/comments']
-            observations = ', '.join(filtered_observations)
-            summary_sheet.cell(row=start_row, column=14).value = observations
-
-            start_row += 1
-
-        # Move the Summary Report sheet to the first position (index 0)
-        summary_sheet_index = wb.sheetnames.index("Summary Report")
-        wb.move_sheet("Summary Report", offset=-summary_sheet_index)
+        added, updated = summarize_workbook(wb, full_rescan=full_rescan, upsert=upsert, reporter=reporter)
 
         # Remove unnecessary ungrouping code (Excel [Group] is a UI feature)
         # (All code related to outline_level, hidden, collapsed, and outlinePr is removed)
 
         # Preserve any grouping in the workbook
-        wb.save(file_path)
-        print(f"Summary Report updated successfully with {len(distributor_data)} new records.")
+        reporter.update("Saving summary workbook", force=True)
+        with metrics.span("save"):
+            wb.save(file_path)
+        print(f"Summary Report updated successfully with {added} new records.")
+        if upsert:
+            print(f"{updated} existing records refreshed.")
         print("Summary Report sheet moved to the first position.")
+        return file_path
+    except RunCancelled:
+        logger.info("Summary generation cancelled")
+        print("Run cancelled. The workbook was not changed.")
     except Exception as e:
         logger.exception(f"Exception in extract_distributor_data: {e}\n{traceback.format_exc()}")
         print(f"Error in extract_distributor_data: {str(e)}")
 
 
+def _report_number_key(record):
+    number = record['Report Number']
+    return (0, int(number), "") if str(number).isdigit() else (1, 0, str(number))
+
+
+def build_consolidated_summary(report_files, output_file):
+    """
+    Write one Summary Report covering several report workbooks (e.g. the
+    shards of a sharded run) to a new workbook, in report number order.
+
+    Every report workbook is streamed read-only; none of them is modified.
+    Returns ``output_file`` once saved, or None on failure.
+    """
+    try:
+        records = [
+            record for report_file in report_files
+            for record in read_distributor_records(report_file)
+        ]
+        records.sort(key=_report_number_key)
+
+        wb = Workbook()
+        default_sheet = wb.active
+        summary_sheet = add_summary_sheet(wb)
+        wb.remove(default_sheet)
+
+        styles = get_style_registry(summary_sheet)
+        for row, data in enumerate(records, summary_sheet.max_row + 1):
+            write_summary_row(summary_sheet, styles, row, data)
+
+        wb.save(output_file)
+        print(f"Consolidated Summary Report with {len(records)} records saved to: {output_file}")
+        return output_file
+    except Exception as e:
+        logger.exception(f"Exception in build_consolidated_summary: {e}\n{traceback.format_exc()}")
+        print(f"Error in build_consolidated_summary: {str(e)}")
+
+
 # === MAIN SCRIPT ===
 if __name__ == "__main__":
+    configure_logging()
     try:
         selected_file = select_file()
         if selected_file: